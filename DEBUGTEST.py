@@ -1,11 +1,11 @@
 import sys
 import numpy as np
 from PyQt6.QtWidgets import QApplication, QMainWindow
-from PyQt6.QtGui import QPainter, QPen
+from PyQt6.QtGui import QPainter, QPen, QImage
 from PyQt6.QtCore import Qt
 
 class ShapeWindow(QMainWindow):
-    def __init__(self, func, scale=200, resolution=500):
+    def __init__(self, func, scale=200, resolution=500, precision='f32'):
         """
         func : callable
             A function f(x, y) that returns 0 on the shape
@@ -13,6 +13,9 @@ class ShapeWindow(QMainWindow):
             How many pixels per unit
         resolution : int
             Number of points along each axis
+        precision : str
+            'f32' (default, half the memory traffic) or 'f64' for shapes
+            where single precision aliases
         """
         super().__init__()
         self.setWindowTitle("Math Shape Plotter")
@@ -20,28 +23,69 @@ class ShapeWindow(QMainWindow):
         self.func = func
         self.scale = scale
         self.resolution = resolution
+        self.dtype = {'f32': np.float32, 'f64': np.float64}[precision]
+
+        # Paint state that doesn't change between frames
+        self._pen = QPen(Qt.GlobalColor.black, 1)
+        self._pen.setCosmetic(True)
+        self._pixel = self._pen.color().rgba()
+        self._image = None
+
+    def _candidate_mask(self, x_vals, y_vals, threshold, step=8):
+        """
+        Coarse bracketing pass: sample func on every step-th grid node and keep
+        only the coarse cells whose corner values could reach |f| < threshold.
+        Returns a full-resolution boolean mask of the points worth evaluating.
+        """
+        n = x_vals.shape[0]
+        idx = np.unique(np.r_[0:n:step, n - 1])
+        Fc = np.broadcast_to(self.func(x_vals[idx], y_vals[:, idx]), (len(idx), len(idx)))
+
+        corners = np.stack([Fc[:-1, :-1], Fc[1:, :-1], Fc[:-1, 1:], Fc[1:, 1:]])
+        lo, hi = corners.min(axis=0), corners.max(axis=0)
+        slack = hi - lo  # allow f to bulge past its corner values inside a cell
+        active = (lo - slack <= threshold) & (hi + slack >= -threshold)
+
+        span = np.diff(idx)
+        span[-1] += 1  # last cell also owns the final grid line
+        return active.repeat(span, axis=0).repeat(span, axis=1)
 
     def paintEvent(self, event):
+        # No antialiasing: the curve is a single-color pixel blit
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        pen = QPen(Qt.GlobalColor.black, 1)
-        painter.setPen(pen)
+        painter.setPen(self._pen)
 
         width, height = self.width(), self.height()
         cx, cy = width // 2, height // 2
 
-        # Create a grid in "math coordinates"
-        x_vals = np.linspace(-1.5, 1.5, self.resolution)
-        y_vals = np.linspace(-1.5, 1.5, self.resolution)
-
-        # Draw points where |f(x, y)| is small
-        threshold = 0.01
-        for x in x_vals:
-            for y in y_vals:
-                if abs(self.func(x, y)) < threshold:
-                    px = cx + x * self.scale
-                    py = cy - y * self.scale  # invert y for screen
-                    painter.drawPoint(int(px), int(py))
+        # Create an open grid in "math coordinates": shapes (N, 1) and (1, N),
+        # broadcast inside func instead of materializing two N x N arrays
+        axis = np.linspace(-1.5, 1.5, self.resolution, dtype=self.dtype)
+        x_vals, y_vals = axis[:, None], axis[None, :]
+
+        # Only evaluate the fine grid near the curve (x along axis 0, y along axis 1)
+        threshold = self.dtype(0.01)
+        ix, iy = np.nonzero(self._candidate_mask(x_vals, y_vals, threshold))
+        F = np.broadcast_to(self.func(x_vals[ix, 0], y_vals[0, iy]), ix.shape)
+
+        # Keep points where |f(x, y)| is small
+        hit = np.abs(F) < threshold
+        ix, iy = ix[hit], iy[hit]
+        px = (cx + x_vals[ix, 0] * self.scale).astype(np.int32)
+        py = (cy - y_vals[0, iy] * self.scale).astype(np.int32)  # invert y for screen
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+
+        # Write the hits straight into an image buffer and blit it in one call;
+        # the buffer is only reallocated when the window size changes
+        img = self._image
+        if img is None or img.width() != width or img.height() != height:
+            img = self._image = QImage(width, height, QImage.Format.Format_ARGB32)
+        img.fill(Qt.GlobalColor.transparent)
+        ptr = img.bits()
+        ptr.setsize(img.sizeInBytes())
+        pixels = np.frombuffer(ptr, np.uint32).reshape(height, img.bytesPerLine() // 4)
+        pixels[py[inside], px[inside]] = self._pixel
+        painter.drawImage(0, 0, img)
 
 # Example usage: unit circle
 def circle(x, y):
@@ -22,7 +22,7 @@ Parameters:
 from sympy import symbols, sqrt, Abs, Max, Min, sympify, parse_expr
 from sympy.abc import x, y, z, w, v, u, t, s, r, q
 import re
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 
 class DimensionAgnosticBuilder:
@@ -30,6 +30,15 @@ class DimensionAgnosticBuilder:
     Build dimension-agnostic expressions using function notation
     """
     
+    # Dim[i] indexing
+    _DIM_IDX_RE = re.compile(r'Dim\[(\d+)\]')
+    # Start of a dimension function call, or a plain parenthesis
+    _FUNC_TOKEN_RE = re.compile(r'\b(sum|prod|max|min)\(|[()]')
+    # Characters that force a sum/prod term to be parenthesized
+    _TERM_OPERATORS = frozenset('+-*/^%<>=, ')
+    # Dimensions whose identity expansions are precomputed at construction
+    PRECOMPUTED_DIMS = (2, 3, 4)
+    
     def __init__(self):
         self.coord_symbols = [x, y, z, w, v, u, t, s, r, q]
         self.coord_names = ['x', 'y', 'z', 'w', 'v', 'u', 't', 's', 'r', 'q']
@@ -124,6 +133,20 @@ class DimensionAgnosticBuilder:
                 "description": "Star-like shape"
             },
         }
+        
+        # Identity expansions for the common dimensions, computed once:
+        # _precomputed holds the structural form (Dim[i] and sum/prod/max/min
+        # expanded, parameters not yet substituted), _default_expansions the
+        # final string with the identity's default parameters
+        self._precomputed: Dict[Tuple[str, int], str] = {}
+        self._default_expansions: Dict[Tuple[str, int], str] = {}
+        for name, identity in self.identities.items():
+            for dim in self.PRECOMPUTED_DIMS:
+                if dim < identity.get('min_dim', 1):
+                    continue
+                form = self._expand_structure(identity['expr'], dim)
+                self._precomputed[(name, dim)] = form
+                self._default_expansions[(name, dim)] = self._replace_params(form, identity['params'])
     
     def get_coords(self, n: int) -> List:
         """Get n coordinate symbols"""
@@ -156,17 +179,22 @@ class DimensionAgnosticBuilder:
         if params is None:
             params = {}
         
-        # Step 1: Replace indexed Dim (e.g., Dim[0], Dim[1])
-        expr_str = self._replace_indexed_dims(expr_str, dimension)
-        
-        # Step 2: Expand dimension functions (sum, prod, max, min)
-        expr_str = self._expand_functions(expr_str, dimension)
+        # Steps 1-2: Replace indexed Dim and expand dimension functions
+        expr_str = self._expand_structure(expr_str, dimension)
         
         # Step 3: Replace parameters with values
         expr_str = self._replace_params(expr_str, params)
         
         return expr_str
     
+    def _expand_structure(self, expr_str: str, dimension: int) -> str:
+        """Expand everything that depends on the dimension, leaving parameters as-is"""
+        # Step 1: Replace indexed Dim (e.g., Dim[0], Dim[1])
+        expr_str = self._replace_indexed_dims(expr_str, dimension)
+        
+        # Step 2: Expand dimension functions (sum, prod, max, min)
+        return self._expand_functions(expr_str, dimension)
+    
     def _replace_indexed_dims(self, expr_str: str, dimension: int) -> str:
         """Replace Dim[i] with actual coordinates"""
         def replacer(match):
@@ -175,53 +203,70 @@ class DimensionAgnosticBuilder:
                 raise ValueError(f"Index Dim[{idx}] out of range for {dimension}D")
             return self.coord_names[idx]
         
-        return re.sub(r'Dim\[(\d+)\]', replacer, expr_str)
+        return self._DIM_IDX_RE.sub(replacer, expr_str)
     
     def _expand_functions(self, expr_str: str, dimension: int) -> str:
-        """Expand sum(), prod(), max(), min() functions"""
+        """
+        Expand sum(), prod(), max(), min() functions
         
-        # Find all function calls recursively (innermost first)
-        while True:
-            # Match function(expression) where expression doesn't contain nested functions
-            match = re.search(r'(sum|prod|max|min)\(([^()]+)\)', expr_str)
-            if not match:
-                break
-            
-            func_name = match.group(1)
-            inner_expr = match.group(2)
-            
-            # Generate terms for each dimension
-            coords = self.coord_names[:dimension]
-            terms = []
-            
-            for coord in coords:
-                # Replace 'Dim' with actual coordinate
-                term = inner_expr.replace('Dim', coord)
-                terms.append(term)
-            
-            # Combine terms based on function type
-            if func_name == 'sum':
-                replacement = ' + '.join(f'({t})' for t in terms)
-            elif func_name == 'prod':
-                replacement = ' * '.join(f'({t})' for t in terms)
-            elif func_name == 'max':
-                replacement = f'Max({", ".join(terms)})'
-            elif func_name == 'min':
-                replacement = f'Min({", ".join(terms)})'
+        Single left-to-right pass: each open call gets its own chunk buffer
+        on a stack, and is expanded when its closing paren is reached, so
+        nested calls are expanded innermost first without re-scanning.
+        """
+        coords = self.coord_names[:dimension]
+        
+        # Stack of (function name or None for a plain paren, output chunks)
+        stack = [(None, [])]
+        pos = 0
+        for match in self._FUNC_TOKEN_RE.finditer(expr_str):
+            stack[-1][1].append(expr_str[pos:match.start()])
+            pos = match.end()
             
-            # Replace the function call with expanded version
-            expr_str = expr_str[:match.start()] + f'({replacement})' + expr_str[match.end():]
+            if match.group(1):
+                stack.append((match.group(1), []))
+            elif match.group() == '(':
+                stack.append((None, ['(']))
+            else:
+                if len(stack) == 1:
+                    raise ValueError(f"Unbalanced parentheses in: {expr_str}")
+                func_name, chunks = stack.pop()
+                inner_expr = ''.join(chunks)
+                if func_name is None:
+                    stack[-1][1].append(inner_expr + ')')
+                else:
+                    replacement = self._combine_terms(func_name, inner_expr, coords)
+                    stack[-1][1].append(f'({replacement})')
         
-        return expr_str
+        if len(stack) != 1:
+            raise ValueError(f"Unbalanced parentheses in: {expr_str}")
+        stack[0][1].append(expr_str[pos:])
+        return ''.join(stack[0][1])
+    
+    def _combine_terms(self, func_name: str, inner_expr: str, coords: List[str]) -> str:
+        """Expand one dimension function call over the given coordinates"""
+        # Generate terms for each dimension from one split template
+        parts = inner_expr.split('Dim')
+        terms = [coord.join(parts) for coord in coords]
+        
+        # Combine terms based on function type
+        if func_name in ('sum', 'prod'):
+            # Terms only need their own parens if they contain operators
+            if any(op in inner_expr for op in self._TERM_OPERATORS):
+                terms = [f'({t})' for t in terms]
+            return (' + ' if func_name == 'sum' else ' * ').join(terms)
+        elif func_name == 'max':
+            return f'Max({", ".join(terms)})'
+        else:
+            return f'Min({", ".join(terms)})'
     
     def _replace_params(self, expr_str: str, params: Dict[str, float]) -> str:
         """Replace parameter placeholders with actual values"""
-        for param_name, param_value in params.items():
-            # Replace whole-word parameters only (not inside other words)
-            pattern = r'\b' + param_name + r'\b'
-            expr_str = re.sub(pattern, str(param_value), expr_str)
+        if not params:
+            return expr_str
         
-        return expr_str
+        # Replace whole-word parameters only (not inside other words), all in one pass
+        pattern = re.compile(r'\b(' + '|'.join(map(re.escape, params)) + r')\b')
+        return pattern.sub(lambda m: str(params[m.group(1)]), expr_str)
     
     def get_identity(self, name: str) -> Dict:
         """Get an identity from the library"""
@@ -252,12 +297,20 @@ class DimensionAgnosticBuilder:
         if dimension < min_dim:
             raise ValueError(f"{name} requires at least {min_dim}D (got {dimension}D)")
         
+        key = (name, dimension)
+        if not params and key in self._default_expansions:
+            return self._default_expansions[key]
+        
         # Use provided params or defaults
         final_params = identity['params'].copy()
         if params:
             final_params.update(params)
         
-        return self.expand(identity['expr'], dimension, final_params)
+        # Only the parameter substitution depends on params
+        form = self._precomputed.get(key)
+        if form is None:
+            form = self._expand_structure(identity['expr'], dimension)
+        return self._replace_params(form, final_params)
 
 
 if __name__ == "__main__":
@@ -7,8 +7,208 @@ Fully compatible with Python 3.12
 from sympy import *
 from sympy.parsing.sympy_parser import parse_expr
 from sympy import Eq, Max, Min, Abs, sin, cos, tan
+import logging
 import re
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import numba
+except ImportError:  # optional: JIT-compiled grid evaluation
+    numba = None
+
+try:
+    import numexpr
+    from sympy.printing.lambdarepr import NumExprPrinter
+except ImportError:  # optional: multithreaded grid evaluation
+    numexpr = None
+
+
+log = logging.getLogger(__name__)
+
+# Start of a dimension-agnostic call (sum, product, max, min), or a plain parenthesis
+_CALL_TOKEN_RE = re.compile(r'\b(sum|product|max|min)\(|[()]')
+
+# The dimension variable n (but not n[i] or part of a longer name)
+_DIM_VAR_RE = re.compile(r'\bn\b(?!\s*\[)')
+
+# Stands in for n while a call's inner expression is parsed
+_DIM_VAR = Symbol('__DIM_VAR')
+
+# How each dimension-agnostic call combines its per-coordinate terms
+_COMBINERS = {
+    'sum': lambda terms: Add(*terms),
+    'product': lambda terms: Mul(*terms),
+    'max': lambda terms: Max(*terms),
+    'min': lambda terms: Min(*terms),
+}
+
+# User function definition: Name(params) = expr
+_FUNC_DEF_RE = re.compile(r'(\w+)\((.*?)\)\s*=\s*(.+)')
+
+
+# Single-character tokens of the fast parser's grammar ('**' is handled apart)
+_FAST_OPERATORS = frozenset('+-*/()')
+
+
+def _fast_tokenize(text: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    Split text into (kind, value) tokens: 'num', 'name', '**' or an operator.
+    Returns None at the first character outside that grammar.
+    """
+    tokens = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch in ' \t':
+            i += 1
+        elif ch.isdigit() or (ch == '.' and i + 1 < n and text[i + 1].isdigit()):
+            start = i
+            while i < n and text[i].isdigit():
+                i += 1
+            if i < n and text[i] == '.':
+                i += 1
+                while i < n and text[i].isdigit():
+                    i += 1
+            if i < n and text[i] in 'eE':
+                i += 1
+                if i < n and text[i] in '+-':
+                    i += 1
+                if i == n or not text[i].isdigit():
+                    return None
+                while i < n and text[i].isdigit():
+                    i += 1
+            # 3x, 1.2.3: not Python syntax, leave the error to parse_expr
+            if i < n and (text[i].isalnum() or text[i] in '._'):
+                return None
+            # 007: Python only allows leading zeros on a zero integer (00)
+            value = text[start:i]
+            if value.isdigit() and value[0] == '0' and value.strip('0'):
+                return None
+            tokens.append(('num', value))
+        elif ch.isalpha() or ch == '_':
+            start = i
+            while i < n and (text[i].isalnum() or text[i] == '_'):
+                i += 1
+            tokens.append(('name', text[start:i]))
+        elif text.startswith('**', i):
+            tokens.append(('**', '**'))
+            i += 2
+        elif ch in _FAST_OPERATORS:
+            if text.startswith('//', i):
+                return None
+            tokens.append((ch, ch))
+            i += 1
+        else:
+            return None
+    return tokens
+
+
+def _fast_parse(text: str, names: Dict[str, Basic]) -> Optional[Basic]:
+    """
+    Parse plain arithmetic over the given names without going through
+    parse_expr's tokenize/transform/eval round trip.
+    
+    Handles numbers, names, + - * / ** and parentheses with Python's
+    precedence, and builds exactly the tree parse_expr(evaluate=False)
+    builds: a - b is Add(a, Mul(-1, b)), a / b is Mul(a, Pow(b, -1)),
+    nested Add/Mul are flattened and unary minus is applied eagerly.
+    Returns None for anything else (functions, unknown names, syntax
+    errors), and the caller falls back to parse_expr.
+    """
+    tokens = _fast_tokenize(text)
+    if not tokens:
+        return None
+    pos = 0
+
+    # Nodes are ('Add' | 'Mul', [args]), ('Pow', base, exp), ('-' | '+', operand) or a SymPy leaf
+    def peek():
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def flatten(args, op):
+        flat = []
+        for arg in args:
+            if isinstance(arg, tuple) and arg[0] == op:
+                flat.extend(arg[1])
+            else:
+                flat.append(arg)
+        return flat
+
+    def expression():
+        nonlocal pos
+        left = term()
+        while peek() in ('+', '-'):
+            op = tokens[pos][0]
+            pos += 1
+            right = term()
+            if op == '-':
+                right = ('Mul', [S.NegativeOne, right])
+            left = ('Add', flatten([left, right], 'Add'))
+        return left
+
+    def term():
+        nonlocal pos
+        left = factor()
+        while peek() in ('*', '/'):
+            op = tokens[pos][0]
+            pos += 1
+            right = factor()
+            if op == '/':
+                right = ('Pow', right, S.NegativeOne)
+            left = ('Mul', flatten([left, right], 'Mul'))
+        return left
+
+    def factor():
+        nonlocal pos
+        if peek() in ('+', '-'):
+            op = tokens[pos][0]
+            pos += 1
+            return (op, factor())
+        base = atom()
+        if peek() == '**':
+            pos += 1
+            return ('Pow', base, factor())
+        return base
+
+    def atom():
+        nonlocal pos
+        kind = peek()
+        if kind is None:
+            raise SyntaxError
+        value = tokens[pos][1]
+        pos += 1
+        if kind == 'num':
+            return Float(value) if any(c in value for c in '.eE') else Integer(value)
+        if kind == 'name':
+            if value not in names:
+                raise SyntaxError
+            return names[value]
+        if kind == '(':
+            inner = expression()
+            if peek() != ')':
+                raise SyntaxError
+            pos += 1
+            return inner
+        raise SyntaxError
+
+    def build(node):
+        if not isinstance(node, tuple):
+            return node
+        op = node[0]
+        if op == 'Add':
+            return Add(*[build(a) for a in node[1]], evaluate=False)
+        if op == 'Mul':
+            return Mul(*[build(a) for a in node[1]], evaluate=False)
+        if op == 'Pow':
+            return Pow(build(node[1]), build(node[2]), evaluate=False)
+        return -build(node[1]) if op == '-' else +build(node[1])
+
+    try:
+        tree = expression()
+    except SyntaxError:
+        return None
+    if pos != len(tokens):
+        return None
+    return build(tree)
 
 
 class MathEnvironment:
@@ -24,6 +224,10 @@ class MathEnvironment:
         self.dimension = dimension
         self.user_functions = {}  # User-defined functions
         self.coord_symbols = self._make_coord_symbols(dimension)
+        self._parse_cache: Dict[Tuple[str, int], Basic] = {}
+        self._lambdify_cache: Dict[Tuple, Tuple[List[Symbol], Callable]] = {}
+        self._numba_cache: Dict[Tuple, Optional[Callable]] = {}
+        self._numexpr_cache: Dict[Tuple, Optional[str]] = {}
 
     def _make_coord_symbols(self, dim: int) -> List[Symbol]:
         coord_names = ['x', 'y', 'z', 'w', 'u', 'v']
@@ -35,107 +239,118 @@ class MathEnvironment:
     def set_dimension(self, dimension: int):
         self.dimension = dimension
         self.coord_symbols = self._make_coord_symbols(dimension)
+        # Parses for other dimensions expanded n against other coordinates
+        self._parse_cache = {k: v for k, v in self._parse_cache.items() if k[1] == dimension}
 
     def parse(self, expr_str: str):
+        """
+        Parse an expression or equation string into SymPy.
+        Cached per (expr_str, dimension); SymPy expressions are immutable,
+        so the cached object is returned as is.
+        """
+        key = (expr_str, self.dimension)
+        parsed = self._parse_cache.get(key)
+        if parsed is None:
+            parsed = self._parse_cache[key] = self._parse(expr_str)
+        return parsed
+
+    def _parse(self, expr_str: str):
         expr_str = expr_str.replace('^', '**')
-        expr = self._replace_dimension_agnostic(expr_str)
-
-        if isinstance(expr, str):
-            local_dict = {str(s): s for s in self.coord_symbols}
-            local_dict.update({'Abs': Abs, 'Max': Max, 'Min': Min, 'sin': sin, 'cos': cos, 'tan': tan})
-            if '=' in expr:
-                parts = expr.split('=')
-                if len(parts) != 2:
-                    raise ValueError(f"Invalid equation: {expr_str} (multiple = signs)")
-                left = parse_expr(parts[0].strip(), evaluate=False, local_dict=local_dict)
-                right = parse_expr(parts[1].strip(), evaluate=False, local_dict=local_dict)
-                return Eq(left, right)
-            else:
-                return parse_expr(expr, evaluate=False, local_dict=local_dict)
+        expr_str, subs_map = self._replace_dimension_agnostic(expr_str)
+
+        local_dict = {str(s): s for s in self.coord_symbols}
+        local_dict.update({'Abs': Abs, 'Max': Max, 'Min': Min, 'sin': sin, 'cos': cos, 'tan': tan})
+
+        # Names the fast path may resolve: coordinates and call placeholders
+        fast_names = {str(s): s for s in self.coord_symbols}
+        fast_names.update({str(s): s for s in subs_map})
+
+        def parse_side(side: str):
+            expr = _fast_parse(side, fast_names)
+            if expr is None:
+                expr = parse_expr(side.strip(), evaluate=False, local_dict=local_dict)
+            return expr.xreplace(subs_map) if subs_map else expr
+
+        if '=' in expr_str:
+            parts = expr_str.split('=')
+            if len(parts) != 2:
+                raise ValueError(f"Invalid equation: {expr_str} (multiple = signs)")
+            return Eq(parse_side(parts[0]), parse_side(parts[1]))
         else:
-            return expr
+            return parse_side(expr_str)
 
-    def _replace_dimension_agnostic(self, expr_str: str):
+    def _replace_dimension_agnostic(self, expr_str: str) -> Tuple[str, Dict[Symbol, Basic]]:
         """
-        Convert sum(n), product(n), max(n), min(n) directly into SymPy objects.
-        Returns either a SymPy expression or string (if no replacement was needed).
+        Convert sum(n), product(n), max(n), min(n) into SymPy sub-expressions.
+        Calls may be nested; they are expanded innermost first. Each call is
+        replaced in the string by a unique placeholder name, so the whole
+        expression is still parsed once with its real operators.
+        Returns the rewritten string and a {placeholder: expression} map for xreplace.
         """
         coord_names = self.coord_symbols
-
-        # sum(...)
-        sum_pattern = re.compile(r'sum\((.*?)\)')
-        while True:
-            m = sum_pattern.search(expr_str)
-            if not m:
-                break
-            inner = m.group(1)
-            terms = [sympify(inner.replace('n', str(c))) for c in coord_names]
-            expr = sum(terms)
-            expr_str = expr_str[:m.start()] + f'@@SUM@@' + expr_str[m.end():]
-            self._temp_replacements = getattr(self, '_temp_replacements', {})
-            self._temp_replacements['@@SUM@@'] = expr
-
-        # product(...)
-        prod_pattern = re.compile(r'product\((.*?)\)')
-        while True:
-            m = prod_pattern.search(expr_str)
-            if not m:
-                break
-            inner = m.group(1)
-            terms = [sympify(inner.replace('n', str(c))) for c in coord_names]
-            expr = 1
-            for t in terms:
-                expr *= t
-            expr_str = expr_str[:m.start()] + f'@@PROD@@' + expr_str[m.end():]
-            self._temp_replacements['@@PROD@@'] = expr
-
-        # max(...)
-        max_pattern = re.compile(r'max\((.*?)\)')
-        while True:
-            m = max_pattern.search(expr_str)
-            if not m:
-                break
-            inner = m.group(1)
-            terms = [sympify(inner.replace('n', str(c))) for c in coord_names]
-            expr = Max(*terms)
-            expr_str = expr_str[:m.start()] + f'@@MAX@@' + expr_str[m.end():]
-            self._temp_replacements['@@MAX@@'] = expr
-
-        # min(...)
-        min_pattern = re.compile(r'min\((.*?)\)')
-        while True:
-            m = min_pattern.search(expr_str)
-            if not m:
-                break
-            inner = m.group(1)
-            terms = [sympify(inner.replace('n', str(c))) for c in coord_names]
-            expr = Min(*terms)
-            expr_str = expr_str[:m.start()] + f'@@MIN@@' + expr_str[m.end():]
-            self._temp_replacements['@@MIN@@'] = expr
+        subs_map = {}
 
         # n[i] replacement
         for i, c in enumerate(coord_names):
             expr_str = expr_str.replace(f'n[{i}]', str(c))
 
-        # Replace placeholders with SymPy objects
-        if hasattr(self, '_temp_replacements') and self._temp_replacements:
-            parts = re.split(r'(@@SUM@@|@@PROD@@|@@MAX@@|@@MIN@@)', expr_str)
-            expr_final = None
-            for p in parts:
-                if p in self._temp_replacements:
-                    e = self._temp_replacements[p]
-                else:
-                    if p.strip() == '':
-                        continue
-                    e = sympify(p)
-                expr_final = e if expr_final is None else expr_final + 0 + e
-            self._temp_replacements.clear()
-            return expr_final
-
-        return expr_str
+        while True:
+            call = self._find_call(expr_str)
+            if call is None:
+                break
+            name, start, inner_start, inner_end, end = call
+            inner = expr_str[inner_start:inner_end]
+
+            if name in ('max', 'min') and self._has_top_level_comma(inner):
+                # Ordinary max(a, b): keep it as text so n is expanded by an enclosing call
+                expr_str = expr_str[:start] + name.capitalize() + expr_str[start + len(name):]
+                continue
+
+            # Parse the term once with n as a symbol, then substitute each coordinate
+            template = sympify(_DIM_VAR_RE.sub(str(_DIM_VAR), inner)).xreplace(subs_map)
+            terms = [template.xreplace({_DIM_VAR: c}) for c in coord_names]
+            placeholder = Symbol(f'__DIM_REPL_{len(subs_map)}')
+            subs_map[placeholder] = _COMBINERS[name](terms)
+            expr_str = expr_str[:start] + str(placeholder) + expr_str[end:]
+
+        return expr_str, subs_map
+
+    @staticmethod
+    def _find_call(expr_str: str) -> Optional[Tuple[str, int, int, int, int]]:
+        """
+        Locate the innermost dimension-agnostic call by tracking paren depth.
+        Returns (name, start, inner_start, inner_end, end) or None.
+        """
+        stack = []
+        for m in _CALL_TOKEN_RE.finditer(expr_str):
+            if m.group(1):
+                stack.append((m.group(1), m.start(), m.end()))
+            elif m.group() == '(':
+                stack.append((None, m.start(), m.end()))
+            elif stack:
+                name, start, inner_start = stack.pop()
+                if name is not None:
+                    return name, start, inner_start, m.start(), m.end()
+            else:
+                raise ValueError(f"Unbalanced parentheses in: {expr_str}")
+        if stack:
+            raise ValueError(f"Unbalanced parentheses in: {expr_str}")
+        return None
+
+    @staticmethod
+    def _has_top_level_comma(inner: str) -> bool:
+        depth = 0
+        for ch in inner:
+            if ch == '(':
+                depth += 1
+            elif ch == ')':
+                depth -= 1
+            elif ch == ',' and depth == 0:
+                return True
+        return False
 
     def define_function(self, definition: str):
-        match = re.match(r'(\w+)\((.*?)\)\s*=\s*(.+)', definition)
+        match = _FUNC_DEF_RE.match(definition)
         if not match:
             raise ValueError(f"Invalid function definition: {definition}")
         func_name = match.group(1)
@@ -155,9 +370,103 @@ class MathEnvironment:
     def list_functions(self) -> List[str]:
         return list(self.user_functions.keys())
 
+    def _compile(self, expr_str: str, modules: str = 'numpy') -> Tuple[List[Symbol], Callable]:
+        """
+        Parse and lambdify expr_str once per (expr_str, dimension, modules).
+        modules='numpy' for array evaluation, 'math' for fast scalar evaluation.
+        """
+        key = (expr_str, self.dimension, modules)
+        compiled = self._lambdify_cache.get(key)
+        if compiled is None:
+            expr = self.parse(expr_str)
+            free = sorted(expr.free_symbols, key=str)
+            compiled = (free, lambdify(free, expr, modules=modules, cse=True))
+            self._lambdify_cache[key] = compiled
+        return compiled
+
+    def _compile_numba(self, expr_str: str) -> Optional[Callable]:
+        """
+        JIT-compile expr_str into a parallel numba ufunc.
+        Returns None when numba is unavailable or can't compile the expression.
+        """
+        key = (expr_str, self.dimension)
+        if key in self._numba_cache:
+            return self._numba_cache[key]
+
+        vec = None
+        if numba is not None:
+            free, _ = self._compile(expr_str)
+            expr = self.parse(expr_str)
+            # Integer literals would make numba type parts of the body as int64
+            expr = expr.xreplace({n: Float(n) for n in expr.atoms(Integer)})
+            try:
+                scalar_fn = numba.njit(lambdify(free, expr, modules='math'))
+                signature = numba.float64(*[numba.float64] * len(free))
+                vec = numba.vectorize([signature], target='parallel')(scalar_fn)
+            except Exception as e:
+                log.warning("numba could not compile %r, using NumPy: %s", expr_str, e)
+                vec = None
+        self._numba_cache[key] = vec
+        return vec
+
     def evaluate(self, expr_str: str, **values) -> float:
-        expr = self.parse(expr_str)
-        return float(expr.subs(values).evalf())
+        free, fn = self._compile(expr_str, modules='math')
+        return float(fn(*[float(v) for v in self._bind(expr_str, free, values)]))
+
+    def _compile_numexpr(self, expr_str: str) -> Optional[str]:
+        """
+        Translate expr_str into a numexpr expression string.
+        Returns None when numexpr is unavailable or doesn't support the expression.
+        """
+        key = (expr_str, self.dimension)
+        if key in self._numexpr_cache:
+            return self._numexpr_cache[key]
+
+        ne_str = None
+        if numexpr is not None:
+            expr = self.parse(expr_str)
+            # numexpr has no n-ary max/min
+            if not expr.has(Max, Min):
+                try:
+                    ne_str = NumExprPrinter()._print(expr)
+                except TypeError:
+                    ne_str = None
+        self._numexpr_cache[key] = ne_str
+        return ne_str
+
+    def evaluate_array(self, expr_str: str, backend: Optional[str] = None, **arrays):
+        """
+        Evaluate expr_str with NumPy arrays (or scalars) bound to its symbols.
+
+        backend: 'numexpr', 'numba' or 'numpy'. By default the fastest available
+        backend that supports the expression is used. Falls back to 'numpy' when
+        the requested backend can't handle the expression.
+        """
+        if backend not in (None, 'numexpr', 'numba', 'numpy'):
+            raise ValueError(f"Unknown backend: {backend}")
+
+        free, fn = self._compile(expr_str)
+        args = self._bind(expr_str, free, arrays)
+        if not free:
+            return fn()
+
+        if backend in (None, 'numexpr'):
+            ne_str = self._compile_numexpr(expr_str)
+            if ne_str is not None:
+                return numexpr.evaluate(ne_str, local_dict={str(s): a for s, a in zip(free, args)})
+
+        if backend in (None, 'numba'):
+            vec = self._compile_numba(expr_str)
+            if vec is not None:
+                return vec(*args)
+
+        return fn(*args)
+
+    def _bind(self, expr_str: str, free: List[Symbol], values: Dict) -> List:
+        try:
+            return [values[str(s)] for s in free]
+        except KeyError as e:
+            raise ValueError(f"Missing value for {e.args[0]} in: {expr_str}")
 
     def solve_equation(self, equation_str: str, solve_for: str):
         equation = self.parse(equation_str)
@@ -2,9 +2,249 @@
 Shape - Represents a mathematical shape with transforms
 """
 
-from sympy import Eq
-from dataclasses import dataclass
-from typing import Tuple, Optional
+from sympy import Eq, Expr, Abs, Max, Min, Piecewise, And, Or, Not, AccumBounds, Integer, oo, lambdify, preorder_traversal
+from sympy.abc import x, y, z
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Iterator, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import math
+import os
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional: fused 2D transform kernel, JIT-compiled shape functions
+    numba = None
+
+
+log = logging.getLogger(__name__)
+
+# Sampling precisions: float32 halves memory traffic, float64 for high-curvature shapes
+PRECISIONS = {'f32': np.float32, 'f64': np.float64}
+
+# Shape fields mirrored into ShapeManager's per-field arrays
+_SOA_FIELDS = ('translation', 'rotation_euler', 'visible', 'color')
+
+# Exact (cos, sin) of axis-aligned yaws; math.cos(math.radians(90)) is 6e-17, not 0
+_AXIS_ROTATIONS = {0: (1.0, 0.0), 1: (0.0, 1.0), 2: (-1.0, 0.0), 3: (0.0, -1.0)}
+
+# Yaws this close (degrees) to a multiple of 90 snap to it; quaternion
+# round trips leave residue like 1e-15 that would defeat the identity checks
+_YAW_EPS = 1e-9
+
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _inverse_transform_2d(X, Y, tx, ty, c, s, xr, yr):
+        """Translate and rotate a 2D grid into xr, yr in one fused pass"""
+        for i in numba.prange(xr.shape[0]):
+            for j in range(xr.shape[1]):
+                u = X[i, j] - tx
+                v = Y[i, j] - ty
+                xr[i, j] = u * c + v * s
+                yr[i, j] = v * c - u * s
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _inverse_transform_open_2d(xs, ys, tx, ty, c, s, xr, yr):
+        """Same as _inverse_transform_2d, for an open grid given by its x and y axes"""
+        for i in numba.prange(xr.shape[0]):
+            v = ys[i] - ty
+            for j in range(xr.shape[1]):
+                u = xs[j] - tx
+                xr[i, j] = u * c + v * s
+                yr[i, j] = v * c - u * s
+else:
+    _inverse_transform_2d = None
+    _inverse_transform_open_2d = None
+
+
+def canonical_expression(equation):
+    """Canonical lhs - rhs form of an equation, the form shapes store and compile"""
+    expr = equation.lhs - equation.rhs if isinstance(equation, Eq) else equation
+    return expr.doit()
+
+
+@lru_cache(maxsize=256)
+def compile_expression(expr, dimension: int = 2, backend: str = 'numpy') -> Callable:
+    """
+    Compiled vectorized f(x, y) (or f(x, y, z) in 3D) for a canonical expression
+    
+    Polynomial-style and piecewise expressions become a numba ufunc when
+    numba is installed; everything else is lambdified to NumPy. With
+    backend='cupy' the function is lambdified to CuPy and takes GPU arrays. The
+    expression is specialized before compiling: numeric constants are
+    folded to floats (e.g. x**2/9 -> 0.111*x**2) and common subexpressions
+    are hoisted.
+    Cached on the expression itself, so shapes whose equations normalize
+    to the same form ("x^2+y^2=25", "x^2+y^2-25=0") share one kernel.
+    """
+    coords = [x, y, z][:dimension]
+    expr = expr.evalf()
+    if backend == 'cupy':
+        return lambdify(coords, expr, modules='cupy', cse=True)
+    # Symbols outside the grid coordinates (e.g. z in a 2D compile) can't be typed by numba
+    if numba is not None and expr.free_symbols <= set(coords) and _is_numba_friendly(expr):
+        try:
+            return _compile_numba_ufunc(coords, expr)
+        except Exception as e:
+            log.warning("numba could not compile %s, using NumPy: %s", expr, e)
+    return lambdify(coords, expr, modules=['numpy'], cse=True)
+
+
+# Functions numba evaluates per point faster than NumPy's whole-array version
+# (NumPy evaluates every Piecewise branch over the full grid)
+_NUMBA_FUNCTIONS = (Abs, Max, Min, Piecewise, And, Or, Not)
+
+
+def _is_numba_friendly(expr) -> bool:
+    """True if expr only uses +, *, integer powers, comparisons and _NUMBA_FUNCTIONS"""
+    for node in preorder_traversal(expr):
+        if node.is_Pow and not node.exp.is_Integer:
+            return False
+        if node.is_Function and not isinstance(node, _NUMBA_FUNCTIONS):
+            return False
+    return True
+
+
+def _compile_numba_ufunc(coords, expr) -> Callable:
+    """
+    Compile expr into a numba ufunc for float32 and float64 grids
+    
+    The whole expression runs per grid point in one pass, so polynomial
+    shapes don't allocate a temporary array per operation. Transcendental
+    functions are left to NumPy, whose SIMD sin/cos/pow beat numba's
+    scalar libm calls.
+    """
+    scalar_fn = numba.njit(lambdify(coords, expr, modules='math'))
+    signatures = [dt(*[dt] * len(coords)) for dt in (numba.float32, numba.float64)]
+    return numba.vectorize(signatures)(scalar_fn)
+
+
+# Rotated open grids with at least this many points use the fused sampler:
+# its one-off compile (~0.2 s per equation) only pays off on big grids
+_FUSED_MIN_POINTS = 1000 * 1000
+
+
+@lru_cache(maxsize=256)
+def _compile_fused_sampler(expr) -> Optional[Callable]:
+    """
+    numba kernel that inverse-transforms an open 2D grid and evaluates expr in one pass
+    
+    sampler(xs, ys, tx, ty, c, s, out) fills out[i, j] with expr at the
+    inverse-transformed point (xs[j], ys[i]), without writing rotated
+    coordinate arrays. float32 only, compiled eagerly. None when numba is
+    unavailable or can't compile expr.
+    """
+    expr = expr.evalf()
+    if numba is None or not expr.free_symbols <= {x, y} or not _is_numba_friendly(expr):
+        return None
+    try:
+        scalar_fn = numba.njit(lambdify([x, y], expr, modules='math'))
+        f32 = numba.float32
+        
+        @numba.njit([(f32[::1], f32[::1], f32, f32, f32, f32, f32[:, ::1])])
+        def sampler(xs, ys, tx, ty, c, s, out):
+            for i in range(out.shape[0]):
+                v = ys[i] - ty
+                for j in range(out.shape[1]):
+                    u = xs[j] - tx
+                    out[i, j] = scalar_fn(u * c + v * s, v * c - u * s)
+    except Exception as e:
+        log.warning("numba could not compile a fused sampler for %s: %s", expr, e)
+        return None
+    return sampler
+
+
+# Half-planes x >= 2**k (and mirrored) tried by _curve_extent_2d
+_EXTENT_EXPONENTS = (-4, 12)
+
+
+@lru_cache(maxsize=256)
+def _curve_extent_2d(expr) -> Tuple[float, float, float, float]:
+    """
+    Conservative bounding box (xmin, xmax, ymin, ymax) of the curve expr(x, y) = 0
+    
+    Each side is found by interval arithmetic: the half-plane x >= R holds
+    no point of the curve if expr over it provably excludes 0. R is
+    searched over powers of two, so the box is loose but never too small.
+    Sides that can't be bounded this way (curves running off to infinity,
+    functions sympy has no interval rules for) are +-inf.
+    """
+    unbounded = (-math.inf, math.inf, -math.inf, math.inf)
+    expr = expr.evalf()
+    if not expr.free_symbols <= {x, y}:
+        return unbounded
+    
+    def side(symbol, sign):
+        other = y if symbol is x else x
+        
+        def empty(k):
+            R = Integer(2) ** k
+            half = AccumBounds(R, oo) if sign > 0 else AccumBounds(-oo, -R)
+            return _excludes_zero(expr, {symbol: half, other: AccumBounds(-oo, oo)})
+        
+        lo, hi = _EXTENT_EXPONENTS
+        if not empty(hi):
+            return sign * math.inf
+        if empty(lo):
+            return sign * 2.0 ** lo
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if empty(mid):
+                hi = mid
+            else:
+                lo = mid
+        return sign * 2.0 ** hi
+    
+    return (side(x, -1), side(x, 1), side(y, -1), side(y, 1))
+
+
+def _rotation_2d(yaw: float) -> Tuple[float, float]:
+    """(cos, sin) of a 2D rotation given in degrees, exact for axis-aligned angles"""
+    quarter = round(yaw / 90.0)
+    if abs(yaw - 90.0 * quarter) < _YAW_EPS:
+        return _AXIS_ROTATIONS[quarter % 4]
+    theta = math.radians(yaw)
+    return (math.cos(theta), math.sin(theta))
+
+
+def _rotation_matrices(quats) -> np.ndarray:
+    """
+    (N, 3, 3) rotation matrices of N (w, x, y, z) quaternions, in one batch
+    
+    Built as (w^2 - |v|^2) I + 2 v v^T + 2 w [v]x, divided by |q|^2 so a
+    slightly denormalized quaternion still gives a pure rotation. A zero
+    quaternion gives the identity.
+    """
+    q = np.asarray(quats, dtype=float).reshape(-1, 4)
+    w, v = q[:, 0], q[:, 1:]
+    vv = np.einsum('ni,ni->n', v, v)
+    R = 2.0 * v[:, :, None] * v[:, None, :]
+    R[:, [0, 1, 2], [0, 1, 2]] += (w * w - vv)[:, None]
+    wv = 2.0 * w[:, None] * v
+    R[:, 0, 1] -= wv[:, 2]
+    R[:, 1, 0] += wv[:, 2]
+    R[:, 0, 2] += wv[:, 1]
+    R[:, 2, 0] -= wv[:, 1]
+    R[:, 1, 2] -= wv[:, 0]
+    R[:, 2, 1] += wv[:, 0]
+    norm2 = w * w + vv
+    zero = norm2 == 0.0
+    R[zero] = np.eye(3)
+    norm2[zero] = 1.0
+    return R / norm2[:, None, None]
+
+
+def _excludes_zero(expr, intervals) -> bool:
+    """True if expr provably has no zero with its symbols ranging over intervals"""
+    try:
+        bounds = expr.xreplace(intervals)
+    except Exception:
+        return False
+    lo, hi = (bounds.min, bounds.max) if isinstance(bounds, AccumBounds) else (bounds, bounds)
+    return bool(lo.is_extended_positive) or bool(hi.is_extended_negative)
 
 
 @dataclass
@@ -33,6 +273,30 @@ class Shape:
     visible: bool = True
     color: str = "blue"
     
+    # Memoized result of get_transformed_equation, reset when equation changes
+    _cached_eq: Optional[Eq] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Owning ShapeManager, kept in sync when transform/visibility fields change
+    _manager: Optional['ShapeManager'] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == 'equation':
+            # Canonical lhs - rhs form, normalized once; equation is kept for display
+            super().__setattr__('_expr', canonical_expression(value))
+            super().__setattr__('_cached_eq', None)
+            super().__setattr__('_compiled', {})
+        elif name == 'rotation_quat':
+            # Rotation matrix of this quaternion, built on first use (3D only)
+            super().__setattr__('_rot_matrix', None)
+        elif name in _SOA_FIELDS:
+            if name == 'rotation_euler':
+                # cos/sin of the 2D rotation, so sampling does no trig per frame
+                super().__setattr__('_rot_2d', _rotation_2d(value[2]))
+            manager = getattr(self, '_manager', None)
+            if manager is not None:
+                manager._store(self)
+    
     def set_rotation_euler(self, pitch: float = 0.0, roll: float = 0.0, yaw: float = 0.0):
         """
         Set rotation using Euler angles (degrees) and auto-calculate quaternion
@@ -40,8 +304,6 @@ class Shape:
         In 2D: only yaw matters (rotation around z-axis)
         In 3D: all three angles used
         """
-        import math
-        
         self.rotation_euler = (pitch, roll, yaw)
         
         # Convert to radians
@@ -73,6 +335,45 @@ class Shape:
         
         self.rotation_quat = (w, x, y, z)
     
+    @classmethod
+    def batch_set_rotation_euler(cls, shapes, eulers):
+        """
+        Set Euler angles (degrees) on many shapes, computing all quaternions at once
+    
+        Same result as calling set_rotation_euler on each shape, but the
+        trig runs as a handful of NumPy operations over the whole batch.
+    
+        Args:
+            shapes: Sequence of N shapes
+            eulers: (N, 3) array of (pitch, roll, yaw) in degrees
+        """
+        eulers = np.asarray(eulers, dtype=float).reshape(-1, 3)
+        if len(eulers) != len(shapes):
+            raise ValueError(f"Got {len(eulers)} rotations for {len(shapes)} shapes")
+    
+        # 2D shapes only rotate around z: drop pitch/roll from their quaternions
+        is_2d = np.array([s.dimension == 2 for s in shapes], dtype=bool)
+        half = np.radians(eulers) * 0.5
+        half[is_2d, :2] = 0.0
+        cp, cr, cy = np.cos(half).T
+        sp, sr, sy = np.sin(half).T
+    
+        quats = np.stack([
+            cr * cp * cy + sr * sp * sy,
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy,
+        ], axis=1)
+    
+        # Rotation matrices of the 3D shapes, in the same batch
+        matrices = _rotation_matrices(quats)
+    
+        for shape, euler, quat, R, flat in zip(shapes, eulers.tolist(), quats.tolist(), matrices, is_2d):
+            shape.rotation_euler = tuple(euler)
+            shape.rotation_quat = tuple(quat)
+            if not flat:
+                shape._rot_matrix = R
+    
     def get_rotation_angle_2d(self) -> float:
         """Get the 2D rotation angle in degrees (just the yaw component)"""
         return self.rotation_euler[2]  # yaw
@@ -82,8 +383,6 @@ class Shape:
         Convert quaternion to Euler angles (degrees)
         Returns: (pitch, roll, yaw) in degrees
         """
-        import math
-        
         w, x, y, z = self.rotation_quat
         
         # Roll (x-axis rotation)
@@ -91,21 +390,134 @@ class Shape:
         cosr_cosp = 1 - 2 * (x * x + y * y)
         roll = math.atan2(sinr_cosp, cosr_cosp)
         
-        # Pitch (y-axis rotation)
-        sinp = 2 * (w * y - z * x)
-        if abs(sinp) >= 1:
-            pitch = math.copysign(math.pi / 2, sinp)  # use 90 degrees if out of range
-        else:
-            pitch = math.asin(sinp)
-        
         # Yaw (z-axis rotation)
         siny_cosp = 2 * (w * z + x * y)
         cosy_cosp = 1 - 2 * (y * y + z * z)
         yaw = math.atan2(siny_cosp, cosy_cosp)
         
+        # Pitch (y-axis rotation): atan2 against cos(pitch) taken directly from
+        # the yaw terms, instead of asin(sinp). Stays accurate near +-90 degrees
+        # and needs no branch for rounding that pushes |sinp| past 1
+        sinp = 2 * (w * y - z * x)
+        pitch = math.atan2(sinp, math.hypot(siny_cosp, cosy_cosp))
+        
         # Convert to degrees
         return (math.degrees(pitch), math.degrees(roll), math.degrees(yaw))
     
+    @property
+    def rotation_matrix(self) -> np.ndarray:
+        """3x3 matrix of rotation_quat, so N points rotate as one pts @ R.T"""
+        R = self._rot_matrix
+        if R is None:
+            R = _rotation_matrices(self.rotation_quat)[0]
+            self._rot_matrix = R
+        return R
+    
+    def get_function(self, dimension: int = 2) -> Callable:
+        """Compiled numpy function of the base equation (no transforms), kept until equation changes"""
+        fn = self._compiled.get(dimension)
+        if fn is None:
+            fn = self._compiled[dimension] = compile_expression(self._expr, dimension)
+        return fn
+    
+    def get_bbox_2d(self) -> Tuple[float, float, float, float]:
+        """
+        Conservative bounding box (xmin, xmax, ymin, ymax) of the transformed 2D curve
+        
+        The base curve's box is found once per equation; this shape's rotation
+        and translation are applied to its corners. Unbounded sides are +-inf.
+        """
+        xmin, xmax, ymin, ymax = _curve_extent_2d(self._expr)
+        tx, ty, _ = self.translation
+        c, s = self._rot_2d
+        if s == 0.0 and c == 1.0:
+            return (xmin + tx, xmax + tx, ymin + ty, ymax + ty)
+        if not all(map(math.isfinite, (xmin, xmax, ymin, ymax))):
+            return (-math.inf, math.inf, -math.inf, math.inf)
+        u = np.array([xmin, xmax, xmin, xmax])
+        v = np.array([ymin, ymin, ymax, ymax])
+        X = u * c - v * s + tx
+        Y = u * s + v * c + ty
+        return (float(X.min()), float(X.max()), float(Y.min()), float(Y.max()))
+    
+    def sample(self, X: np.ndarray, Y: np.ndarray, fn: Callable,
+               buffers: Optional[Tuple[np.ndarray, ...]] = None) -> np.ndarray:
+        """
+        Evaluate the compiled base equation fn(x, y) with this shape's transform
+        
+        The inverse translation/rotation is applied to the sample coordinates,
+        so one compiled fn can be shared by every shape with the same equation.
+        
+        Args:
+            X, Y: Grid coordinates, either full grids or open (1, W) / (H, 1)
+                axes that broadcast against each other
+            buffers: Optional four scratch arrays shaped like the full grid;
+                rotated coordinates are then computed in place
+        
+        Returns:
+            Field of the full broadcast grid shape
+        """
+        tx, ty, _ = self.translation
+        c, s = self._rot_2d
+        unrotated = s == 0.0 and c == 1.0
+        grid_shape = np.broadcast_shapes(X.shape, Y.shape)
+        
+        if unrotated and tx == 0 and ty == 0:
+            # Identity transform: evaluate the grid itself, no coordinate copies
+            result = fn(X, Y)
+            if result is X or result is Y:
+                result = result.copy()
+        # No scratch space, or an unrotated open grid: translating only touches the axes
+        elif buffers is None or (unrotated and X.shape != grid_shape):
+            u = X - tx
+            v = Y - ty
+            result = fn(u, v) if unrotated else fn(u * c + v * s, -u * s + v * c)
+        elif self._use_fused_sampler(X, Y, fn):
+            # Big rotated open grid: transform and evaluate in one pass
+            result = np.empty(grid_shape, dtype=np.float32)
+            f32 = np.float32
+            _compile_fused_sampler(self._expr)(X[0], Y[:, 0], f32(tx), f32(ty), f32(c), f32(s), result)
+        else:
+            u, v, xr, yr = buffers
+            if unrotated:
+                np.subtract(X, tx, out=u)
+                np.subtract(Y, ty, out=v)
+                xr, yr = u, v
+            elif _inverse_transform_2d is not None and X.shape == Y.shape == xr.shape:
+                # One fused pass over the grid instead of eight ufunc passes
+                _inverse_transform_2d(X, Y, tx, ty, c, s, xr, yr)
+            elif (_inverse_transform_open_2d is not None
+                  and X.shape == (1, xr.shape[1]) and Y.shape == (xr.shape[0], 1)):
+                _inverse_transform_open_2d(X[0], Y[:, 0], tx, ty, c, s, xr, yr)
+            else:
+                np.subtract(X, tx, out=u)
+                np.subtract(Y, ty, out=v)
+                np.multiply(u, c, out=xr)
+                np.multiply(v, s, out=yr)
+                np.add(xr, yr, out=xr)
+                np.multiply(v, c, out=yr)
+                np.multiply(u, s, out=u)
+                np.subtract(yr, u, out=yr)
+            
+            result = fn(xr, yr)
+            # fn may hand back a scratch buffer itself (e.g. f(x, y) = x)
+            if any(result is b for b in buffers):
+                result = result.copy()
+        
+        # fn may not depend on both coordinates (e.g. f(x, y) = x - 1)
+        if np.shape(result) != grid_shape:
+            result = np.broadcast_to(result, grid_shape).copy()
+        return result
+    
+    def _use_fused_sampler(self, X: np.ndarray, Y: np.ndarray, fn: Callable) -> bool:
+        """True if sample can use the fused kernel: a big float32 open grid and this shape's 2D fn"""
+        return (X.ndim == Y.ndim == 2 and X.shape[0] == 1 and Y.shape[1] == 1
+                and X.dtype == Y.dtype == np.float32
+                and X.flags.c_contiguous and Y.flags.c_contiguous
+                and X.size * Y.size >= _FUSED_MIN_POINTS
+                and fn is self._compiled.get(2)
+                and _compile_fused_sampler(self._expr) is not None)
+    
     def get_transformed_equation(self):
         """
         Get the BASE equation without transforms
@@ -117,11 +529,9 @@ class Shape:
         This method now just returns the original equation.
         Transforms are handled in the plotter.
         """
-        if isinstance(self.equation, Eq):
-            expr = self.equation.lhs - self.equation.rhs
-            return Eq(expr, 0)
-        else:
-            return self.equation
+        if self._cached_eq is None:
+            self._cached_eq = Eq(self._expr, 0)
+        return self._cached_eq
     
     def __repr__(self):
         vis = "✓" if self.visible else "✗"
@@ -134,11 +544,45 @@ class Shape:
 class ShapeManager:
     """
     Manages a collection of shapes
+    
+    Shapes stay the public API, but their render state is also kept as
+    parallel per-field arrays (structure-of-arrays) so a frame can work
+    on all visible shapes at once instead of chasing Shape attributes.
     """
     
+    COLORS = ['blue', 'red', 'green', 'purple', 'orange', 'cyan', 'magenta']
+    
     def __init__(self):
         self.shapes = []
         self._shape_counter = 0
+        self._reset_arrays()
+    
+    def _reset_arrays(self):
+        self._positions = {}  # id(shape) -> index into shapes and the per-field arrays
+        self._visible_list = None  # get_visible_shapes result, rebuilt when visibility changes
+        self._tx = np.zeros(0)
+        self._ty = np.zeros(0)
+        self._tz = np.zeros(0)
+        self._cos = np.ones(0)  # cos/sin of the 2D rotation (yaw)
+        self._sin = np.zeros(0)
+        self._visible = np.zeros(0, dtype=bool)
+        self._color_idx = np.zeros(0, dtype=np.int32)
+    
+    def _index(self, shape: Shape) -> int:
+        i = self._positions.get(id(shape))
+        if i is not None and self.shapes[i] is shape:
+            return i
+        raise ValueError(f"{shape.name} is not managed by this ShapeManager")
+    
+    def _store(self, shape: Shape):
+        """Copy a shape's render state into the per-field arrays"""
+        i = self._index(shape)
+        self._tx[i], self._ty[i], self._tz[i] = shape.translation
+        self._cos[i], self._sin[i] = shape._rot_2d
+        if self._visible[i] != shape.visible:
+            self._visible[i] = shape.visible
+            self._visible_list = None
+        self._color_idx[i] = self.COLORS.index(shape.color) if shape.color in self.COLORS else -1
     
     def add_shape(self, equation_str: str, equation: Eq, name: Optional[str] = None) -> Shape:
         """
@@ -157,8 +601,7 @@ class ShapeManager:
             name = f"Shape {self._shape_counter}"
         
         # Assign color (cycle through colors)
-        colors = ['blue', 'red', 'green', 'purple', 'orange', 'cyan', 'magenta']
-        color = colors[len(self.shapes) % len(colors)]
+        color = self.COLORS[len(self.shapes) % len(self.COLORS)]
         
         shape = Shape(
             equation_str=equation_str,
@@ -167,25 +610,130 @@ class ShapeManager:
             color=color
         )
         
+        # Equations like "x = x" or "1 = 2" reduce to True/False, not a curve
+        if not isinstance(shape._expr, Expr):
+            raise ValueError(f"Not a curve or surface: {equation_str} (reduces to {shape._expr})")
+        
+        self._positions[id(shape)] = len(self.shapes)
         self.shapes.append(shape)
+        self._visible_list = None
+        self._tx = np.append(self._tx, 0.0)
+        self._ty = np.append(self._ty, 0.0)
+        self._tz = np.append(self._tz, 0.0)
+        self._cos = np.append(self._cos, 1.0)
+        self._sin = np.append(self._sin, 0.0)
+        self._visible = np.append(self._visible, True)
+        self._color_idx = np.append(self._color_idx, np.int32(0))
+        shape._manager = self
+        self._store(shape)
         return shape
     
     def remove_shape(self, shape: Shape):
         """Remove a shape from the collection"""
-        if shape in self.shapes:
-            self.shapes.remove(shape)
+        try:
+            i = self._index(shape)
+        except ValueError:
+            return
+        self.shapes.pop(i)
+        del self._positions[id(shape)]
+        for j in range(i, len(self.shapes)):
+            self._positions[id(self.shapes[j])] = j
+        self._visible_list = None
+        self._tx = np.delete(self._tx, i)
+        self._ty = np.delete(self._ty, i)
+        self._tz = np.delete(self._tz, i)
+        self._cos = np.delete(self._cos, i)
+        self._sin = np.delete(self._sin, i)
+        self._visible = np.delete(self._visible, i)
+        self._color_idx = np.delete(self._color_idx, i)
+        shape._manager = None
     
     def get_visible_shapes(self):
-        """Get all visible shapes"""
-        return [s for s in self.shapes if s.visible]
+        """Get all visible shapes (a shared list; rebuilt only when visibility changes)"""
+        if self._visible_list is None:
+            self._visible_list = [self.shapes[i] for i in np.flatnonzero(self._visible)]
+        return self._visible_list
+    
+    def iter_visible_batch(self) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Yield the visible subset as one batch of per-field arrays
+        
+        Yields:
+            (tx, ty, cos, sin, shape_idx) where cos/sin are of the 2D rotation
+            and shape_idx indexes into the shape list
+        """
+        idx = np.flatnonzero(self._visible)
+        if len(idx):
+            yield self._tx[idx], self._ty[idx], self._cos[idx], self._sin[idx], idx
+    
+    def render_all(self, X: np.ndarray, Y: np.ndarray, out: Optional[np.ndarray] = None,
+                   precision: str = 'f32') -> np.ndarray:
+        """
+        Evaluate every visible shape on the grid (X, Y)
+        
+        Each shape's inverse transform is applied to the grid, not the equation.
+        
+        Args:
+            X, Y: Grid coordinates (any broadcast-compatible shapes)
+            out: Optional array of shape (n_visible, *grid_shape) to write into
+            precision: 'f32' or 'f64' sampling precision
+        
+        Returns:
+            Array of shape (n_visible, *grid_shape), one field per visible shape
+        """
+        dtype = PRECISIONS[precision]
+        X = np.asarray(X, dtype=dtype)
+        Y = np.asarray(Y, dtype=dtype)
+        grid_shape = np.broadcast_shapes(X.shape, Y.shape)
+        n_visible = int(self._visible.sum())
+        if out is None:
+            out = np.empty((n_visible,) + grid_shape, dtype=dtype)
+        
+        for tx, ty, cos_r, sin_r, idx in self.iter_visible_batch():
+            # Keep the per-shape constants in the sampling precision too
+            t = np.stack([tx, ty], axis=1).astype(dtype)
+            cos_r, sin_r = cos_r.astype(dtype), sin_r.astype(dtype)
+            # Inverse rotation per shape: xr = M @ (xy - t) = M @ xy - M @ t
+            M = np.stack([np.stack([cos_r, sin_r], axis=1),
+                          np.stack([-sin_r, cos_r], axis=1)], axis=1)
+            offsets = np.einsum('kij,kj->ki', M, t)
+            # Stacked (2, n_points) grid shared by every shape, so each
+            # transform is one matmul pass plus an in-place offset
+            XY = np.stack(np.broadcast_arrays(X, Y)).reshape(2, -1)
+            # Compile up front, on this thread
+            fns = [self.shapes[i].get_function() for i in idx]
+            
+            def render_one(k):
+                if sin_r[k] == 0 and cos_r[k] == 1:
+                    if t[k, 0] == 0 and t[k, 1] == 0:
+                        out[k] = fns[k](X, Y)
+                        return
+                    xy = XY - t[k, :, None]
+                else:
+                    xy = M[k] @ XY
+                    xy -= offsets[k, :, None]
+                out[k] = fns[k](xy[0].reshape(grid_shape), xy[1].reshape(grid_shape))
+            
+            # Shapes write disjoint slices of out; NumPy releases the GIL inside
+            # its array loops, so independent shapes overlap across cores
+            if len(idx) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(idx), os.cpu_count() or 1)) as pool:
+                    list(pool.map(render_one, range(len(idx))))
+            else:
+                for k in range(len(idx)):
+                    render_one(k)
+        return out
     
     def clear_all(self):
         """Remove all shapes"""
+        for shape in self.shapes:
+            shape._manager = None
         self.shapes.clear()
         self._shape_counter = 0
+        self._reset_arrays()
     
     def __len__(self):
         return len(self.shapes)
     
     def __iter__(self):
-        return iter(self.shapes)
\ No newline at end of file
+        return iter(self.shapes)
@@ -3,13 +3,44 @@ Simple Plotter - Using numpy grid + contour
 More reliable than sympy's plot_implicit
 """
 
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
-from mpl_toolkits.mplot3d import Axes3D
-from sympy import lambdify, Eq
-from sympy.abc import x, y, z
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from contourpy import contour_generator
+from sympy import Eq
 import numpy as np
+import math
+import os
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from math_engine.shape import compile_expression
+
+log = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _get_marching_cubes():
+    """skimage's marching_cubes, imported on first 3D render (None if scikit-image is missing)"""
+    try:
+        from skimage.measure import marching_cubes
+    except ImportError:
+        log.error("scikit-image not installed - install with: pip install scikit-image")
+        return None
+    return marching_cubes
+
+
+@lru_cache(maxsize=None)
+def _get_cupy():
+    """CuPy, imported on first large 2D render (None if it isn't installed)"""
+    try:
+        import cupy
+    except ImportError:
+        return None
+    return cupy
 
 
 class QtPlotWidget(FigureCanvasQTAgg):
@@ -18,15 +49,45 @@ class QtPlotWidget(FigureCanvasQTAgg):
     Uses numpy grid evaluation + contour plotting
     """
     
-    def __init__(self, parent=None, bounds=(-10, 10, -10, 10), mode='2d'):
+    # plot_trisurf cost grows with face count; isosurfaces beyond this are coarsened
+    MAX_TRISURF_FACES = 20000
+    # Slab size for 3D grid evaluation: one coordinate slab fits comfortably in L2
+    TILE_BYTES = 256 * 1024
+    
+    # Isosurfaces kept across 3D redraws (least recently drawn evicted first)
+    MESH_CACHE_SIZE = 32
+    
+    # Below this 2D resolution the CPU kernels beat the GPU round trip
+    GPU_MIN_RESOLUTION = 1000
+    
+    def __init__(self, parent=None, bounds=(-10, 10, -10, 10), mode='2d', backend=None):
         self.figure = Figure(figsize=(8, 8))
         super().__init__(self.figure)
         self.setParent(parent)
         
         self.bounds = bounds
         self.mode = mode  # '2d' or '3d'
+        self.backend = backend  # 'cupy', 'numpy', or None for CuPy on large 2D grids when installed
+        self._grid_cache = {}  # (bounds, resolution, mode) -> (grid, buffers)
+        self._gpu_grid = {}  # (bounds, resolution) -> open (X, Y) axes on the GPU
+        self._line_cache = {}  # (expr, translation, rotation, bounds, resolution) -> zero-level lines
+        self._mesh_cache = OrderedDict()  # (expr, translation, rotation, bounds, resolution) -> isosurface (verts, faces), LRU
+        
+        # 2D blitting: the axes without any curves, captured on the last full
+        # redraw, and the curve artists drawn over it
+        self._background = None
+        self._blit_layout = None  # what the background was drawn for; None forces a full redraw
+        self._artists = []
+        self.mpl_connect('resize_event', self._forget_background)
         
-        if mode == '3d':
+        self._create_axes()
+    
+    def _create_axes(self):
+        """Add the axes for the current mode to the (empty) figure"""
+        bounds = self.bounds
+        if self.mode == '3d':
+            # Imported here so 2D-only sessions never load mplot3d
+            from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 - registers the '3d' projection
             self.ax = self.figure.add_subplot(111, projection='3d')
             self.ax.set_xlabel('x', fontsize=12)
             self.ax.set_ylabel('y', fontsize=12)
@@ -46,6 +107,55 @@ class QtPlotWidget(FigureCanvasQTAgg):
             self.ax.axhline(y=0, color='k', linewidth=0.5)
             self.ax.axvline(x=0, color='k', linewidth=0.5)
     
+    def set_mode(self, mode):
+        """
+        Switch between '2d' and '3d' in place
+        
+        Only the axes are replaced; the canvas, its Qt widget and the
+        equation/mesh caches are kept.
+        """
+        if mode not in ('2d', '3d'):
+            raise ValueError(f"Unknown plot mode: {mode}")
+        if mode == self.mode:
+            return
+        self.mode = mode
+        self._forget_background()
+        self.figure.clear()
+        self._create_axes()
+        self.draw_idle()
+    
+    def _get_grid(self, resolution):
+        """
+        Sampling grid for the current bounds and mode, cached across redraws
+        
+        Returns:
+            (grid, buffers): grid is the open axes (X, Y) in 2D or the full
+            (X, Y, Z) in 3D; buffers are full-size scratch arrays for
+            in-place 2D transforms
+        """
+        key = (self.bounds, resolution, self.mode)
+        if key not in self._grid_cache:
+            # Only the current grid is kept
+            self._grid_cache.clear()
+            
+            # float32: contour/isosurface extraction doesn't need double precision,
+            # and every ufunc in the evaluation moves half the bytes
+            x_min, x_max, y_min, y_max = self.bounds
+            x_vals = np.linspace(x_min, x_max, resolution, dtype=np.float32)
+            y_vals = np.linspace(y_min, y_max, resolution, dtype=np.float32)
+            if self.mode == '2d':
+                # Open grid: (1, res) and (res, 1) axes broadcast inside the
+                # shape function instead of two materialized res x res arrays
+                grid = (x_vals[np.newaxis, :], y_vals[:, np.newaxis])
+                buffers = tuple(np.empty((resolution, resolution), dtype=np.float32) for _ in range(4))
+            else:
+                log.debug("Creating %dx%dx%d 3D grid", resolution, resolution, resolution)
+                z_vals = np.linspace(y_min, y_max, resolution, dtype=np.float32)
+                grid = tuple(np.meshgrid(x_vals, y_vals, z_vals, indexing='ij'))
+                buffers = ()
+            self._grid_cache[key] = (grid, buffers)
+        return self._grid_cache[key]
+    
     def plot_shapes(self, shapes, clear=True, resolution=500):
         """
         Plot multiple shapes (2D or 3D based on mode)
@@ -55,7 +165,7 @@ class QtPlotWidget(FigureCanvasQTAgg):
             clear: Whether to clear previous plots
             resolution: Number of points in each direction
         """
-        print(f"\n[PLOTTER] Plotting {len(shapes)} shapes in {self.mode.upper()} mode")
+        log.debug("Plotting %d shapes in %s mode", len(shapes), self.mode.upper())
         
         if self.mode == '2d':
             self._plot_shapes_2d(shapes, clear, resolution)
@@ -64,90 +174,231 @@ class QtPlotWidget(FigureCanvasQTAgg):
     
     def _plot_shapes_2d(self, shapes, clear, resolution):
         """Plot 2D implicit curves"""
-        if clear:
-            self.ax.clear()
-            self.ax.set_xlabel('x', fontsize=12)
-            self.ax.set_ylabel('y', fontsize=12)
-            self.ax.grid(True, alpha=0.3)
-            self.ax.set_aspect('equal')
-            self.ax.axhline(y=0, color='k', linewidth=0.5)
-            self.ax.axvline(x=0, color='k', linewidth=0.5)
-        
         x_min, x_max, y_min, y_max = self.bounds
         
-        # Create grid once (shared by all shapes)
-        x_vals = np.linspace(x_min, x_max, resolution)
-        y_vals = np.linspace(y_min, y_max, resolution)
-        X, Y = np.meshgrid(x_vals, y_vals)
+        # Grid shared by all shapes, reused across redraws
+        (X, Y), buffers = self._get_grid(resolution)
+        
+        # Curves from the previous redraw: shapes whose equation and transform
+        # didn't change (e.g. only color/visibility toggled) skip evaluation.
+        # Only this redraw's curves are kept for the next one.
+        line_cache, self._line_cache = self._line_cache, {}
+        
+        # Shapes sharing an equation are evaluated once, on a base grid,
+        # and their curves placed by transforming the extracted lines
+        buckets = {}
+        for shape in shapes:
+            key = (shape._expr, shape.translation, shape._rot_2d, self.bounds, resolution)
+            if shape.visible and key not in line_cache:
+                buckets.setdefault(shape._expr, []).append(shape)
+        for bucket in buckets.values():
+            if len(bucket) > 1:
+                line_cache.update(self._shared_lines(bucket, resolution))
         
+        curves = []
         for shape in shapes:
             if not shape.visible:
-                print(f"[PLOTTER] Skipping hidden shape: {shape.name}")
+                log.debug("Skipping hidden shape: %s", shape.name)
                 continue
             
             try:
-                print(f"[PLOTTER] Plotting {shape.name}: {shape.equation_str}")
-                print(f"[PLOTTER]   Translation: {shape.translation[:2]}")
-                print(f"[PLOTTER]   Rotation: {shape.get_rotation_angle_2d()}° (quat: {shape.rotation_quat})")
-                print(f"[PLOTTER]   Color: {shape.color}")
-                
-                # Get the BASE equation (no transforms)
-                base_eq = shape.get_transformed_equation()
-                
-                # Convert to expression
-                if isinstance(base_eq, Eq):
-                    expr = base_eq.lhs - base_eq.rhs
-                else:
-                    expr = base_eq
-                
-                # Convert to numpy function
-                f = lambdify([x, y], expr, modules=['numpy'])
+                log.debug("Plotting %s: %s (translation %s, rotation %s°, color %s)",
+                          shape.name, shape.equation_str, shape.translation[:2],
+                          shape.rotation_euler[2], shape.color)
                 
-                # Apply INVERSE transforms to the grid points
-                tx, ty, _ = shape.translation
-                X_transformed = X - tx
-                Y_transformed = Y - ty
-                
-                # Rotation (inverse = rotate by -theta)
-                theta_deg = shape.get_rotation_angle_2d()
-                if theta_deg != 0:
-                    import math
-                    theta_rad = math.radians(-theta_deg)
-                    cos_theta = np.cos(theta_rad)
-                    sin_theta = np.sin(theta_rad)
-                    
-                    X_rotated = X_transformed * cos_theta - Y_transformed * sin_theta
-                    Y_rotated = X_transformed * sin_theta + Y_transformed * cos_theta
-                    
-                    X_transformed = X_rotated
-                    Y_transformed = Y_rotated
-                
-                # Evaluate
-                Z = f(X_transformed, Y_transformed)
-                
-                # Plot contour
-                self.ax.contour(X, Y, Z, levels=[0], 
-                              colors=shape.color, 
-                              linewidths=2,
-                              label=shape.name)
-                
-                print(f"[PLOTTER] ✓ {shape.name} plotted")
+                key = (shape._expr, shape.translation, shape._rot_2d, self.bounds, resolution)
+                lines = line_cache.get(key)
+                if lines is None:
+                    bx_min, bx_max, by_min, by_max = shape.get_bbox_2d()
+                    if bx_min > x_max or bx_max < x_min or by_min > y_max or by_max < y_min:
+                        # Curve provably outside the view: nothing to sample
+                        lines = []
+                    else:
+                        Z = self._sample_gpu(shape, resolution) if self._use_gpu(resolution) else None
+                        if Z is None:
+                            # Compiled numpy function of the BASE equation (no transforms),
+                            # cached on the shape until its equation changes
+                            f = shape.get_function(2)
+                            
+                            # Evaluate with INVERSE transforms applied to the grid points
+                            with np.errstate(all='ignore'):
+                                Z = shape.sample(X, Y, f, buffers)
+                        if not np.isfinite(Z).all():
+                            Z = np.ma.masked_invalid(Z)
+                        
+                        # Zero level only: contourpy directly, without ax.contour's
+                        # multi-level ContourSet machinery
+                        lines = contour_generator(X[0], Y[:, 0], Z, name='serial').lines(0.0)
+                self._line_cache[key] = lines
+                curves.append((shape, lines))
             
-            except Exception as e:
-                print(f"[PLOTTER] ✗ Error plotting {shape.name}: {e}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                log.exception("Error plotting %s", shape.name)
+        
+        # Every shape's curves go in one collection, colored per segment:
+        # one artist to build and draw instead of one per shape
+        segments, colors = [], []
+        for shape, lines in curves:
+            segments.extend(lines)
+            colors.extend([shape.color] * len(lines))
+        
+        # Same curves, colors and legend on the same axes: only the curve
+        # geometry changed (e.g. a transform edit), so move the existing
+        # artists and blit them over the saved background
+        layout = (self.bounds, len(shapes), [(id(shape), shape.name, shape.color) for shape, _ in curves])
+        if clear and self._background is not None and layout == self._blit_layout:
+            collection = self._artists[0]
+            collection.set_segments(segments)
+            collection.set_color(colors)
+            self.restore_region(self._background)
+            for artist in self._artists:
+                self.ax.draw_artist(artist)
+            self.blit(self.ax.bbox)
+            log.debug("All shapes rendered (blit)")
+            return
+        
+        if clear:
+            self.ax.clear()
+            self.ax.set_xlabel('x', fontsize=12)
+            self.ax.set_ylabel('y', fontsize=12)
+            self.ax.grid(True, alpha=0.3)
+            self.ax.set_aspect('equal')
+            self.ax.axhline(y=0, color='k', linewidth=0.5)
+            self.ax.axvline(x=0, color='k', linewidth=0.5)
+        
+        # Plot curves
+        artists = [self.ax.add_collection(LineCollection(segments, colors=colors, linewidths=2))]
         
         # Set limits
         self.ax.set_xlim(x_min, x_max)
         self.ax.set_ylim(y_min, y_max)
         
-        # Add legend if multiple shapes
+        # Add legend if multiple shapes; entries are per shape, not per artist
         if len(shapes) > 1:
-            self.ax.legend()
+            handles = [Line2D([], [], color=shape.color, linewidth=2, solid_capstyle='butt',
+                              label=shape.name)
+                       for shape, _ in curves]
+            artists.append(self.ax.legend(handles=handles))
         
+        if clear:
+            self._draw_with_background(artists, layout)
+        else:
+            # Earlier curves stay on the axes untracked; blit on a later clear=True redraw
+            self._forget_background()
+            self.draw_idle()
+        log.debug("All shapes rendered")
+    
+    def _draw_with_background(self, artists, layout):
+        """
+        Full redraw that also saves the axes without artists, for blitting
+        
+        The artists are only animated (left out of the canvas draw) while the
+        background is captured, so savefig and later full draws include them.
+        """
+        for artist in artists:
+            artist.set_animated(True)
+        # Synchronous: the background must be captured from this render
         self.draw()
-        print(f"[PLOTTER] ✓ All shapes rendered")
+        self._background = self.copy_from_bbox(self.ax.bbox)
+        for artist in artists:
+            artist.set_animated(False)
+            self.ax.draw_artist(artist)
+        self._artists = artists
+        self._blit_layout = layout
+    
+    def _forget_background(self, event=None):
+        """Drop the saved 2D background; the next redraw is a full one"""
+        self._background = None
+        self._blit_layout = None
+        self._artists = []
+    
+    def _use_gpu(self, resolution):
+        """Whether 2D shapes at this resolution are sampled with CuPy"""
+        if self.backend == 'numpy' or self.mode != '2d':
+            return False
+        if self.backend is None and resolution < self.GPU_MIN_RESOLUTION:
+            return False
+        return _get_cupy() is not None
+    
+    def _sample_gpu(self, shape, resolution):
+        """
+        Sample a shape's field on the GPU; None if that fails
+        
+        The open grid axes stay on the device across redraws and only the
+        finished field is copied back for contour extraction. On failure
+        (e.g. no CUDA device) the widget switches to the CPU backend.
+        """
+        cupy = _get_cupy()
+        key = (self.bounds, resolution)
+        try:
+            grid = self._gpu_grid.get(key)
+            if grid is None:
+                self._gpu_grid.clear()
+                x_min, x_max, y_min, y_max = self.bounds
+                grid = self._gpu_grid[key] = (
+                    cupy.linspace(x_min, x_max, resolution, dtype=cupy.float32)[cupy.newaxis, :],
+                    cupy.linspace(y_min, y_max, resolution, dtype=cupy.float32)[:, cupy.newaxis])
+            f = compile_expression(shape._expr, 2, 'cupy')
+            return cupy.asnumpy(shape.sample(*grid, f))
+        except Exception as e:
+            log.warning("GPU sampling failed, using the CPU: %s", e)
+            self.backend = 'numpy'
+            return None
+    
+    def _shared_lines(self, shapes, resolution):
+        """
+        Zero-level curves for shapes with the same equation from one evaluation
+        
+        The base equation is sampled once, on a grid with the view's spacing
+        that covers every shape's inverse-transformed view, and the extracted
+        lines are moved into place per shape. Rigid transforms commute with
+        level-set extraction, so this matches sampling each shape separately.
+        
+        Returns:
+            {line cache key: lines}, empty if the base grid would cost more
+            than sampling the shapes one by one
+        """
+        x_min, x_max, y_min, y_max = self.bounds
+        corners = np.array([[x_min, y_min], [x_max, y_min], [x_min, y_max], [x_max, y_max]])
+        
+        # Bounding box of the view in each shape's own (untransformed) frame
+        placed = []
+        for shape in shapes:
+            c, s = shape._rot_2d
+            u, v = (corners - shape.translation[:2]).T
+            placed.append((shape, c, s, u * c + v * s, -u * s + v * c))
+        bx_min = min(p[3].min() for p in placed)
+        bx_max = max(p[3].max() for p in placed)
+        by_min = min(p[4].min() for p in placed)
+        by_max = max(p[4].max() for p in placed)
+        
+        dx = (x_max - x_min) / (resolution - 1)
+        dy = (y_max - y_min) / (resolution - 1)
+        nx = math.ceil((bx_max - bx_min) / dx) + 1
+        ny = math.ceil((by_max - by_min) / dy) + 1
+        if nx * ny >= len(shapes) * resolution * resolution:
+            return {}
+        
+        try:
+            Xb, Yb = np.meshgrid(np.linspace(bx_min, bx_max, nx, dtype=np.float32),
+                                 np.linspace(by_min, by_max, ny, dtype=np.float32))
+            with np.errstate(all='ignore'):
+                Zb = shapes[0].get_function(2)(Xb, Yb)
+            Zb = np.broadcast_to(Zb, Xb.shape)
+            if not np.isfinite(Zb).all():
+                Zb = np.ma.masked_invalid(Zb)
+            base_lines = contour_generator(Xb, Yb, Zb, name='serial').lines(0.0)
+        except Exception as e:
+            log.warning("Shared evaluation failed, sampling shapes separately: %s", e)
+            return {}
+        
+        shared = {}
+        for shape, c, s, _, _ in placed:
+            tx, ty, _ = shape.translation
+            rot = np.array([[c, s], [-s, c]])  # row vectors: p @ rot rotates by +theta
+            key = (shape._expr, shape.translation, shape._rot_2d, self.bounds, resolution)
+            shared[key] = [line @ rot + (tx, ty) for line in base_lines]
+        return shared
     
     def _plot_shapes_3d(self, shapes, clear, resolution=30):
         """Plot 3D implicit surfaces using isosurfaces (OPTIMIZED)"""
@@ -160,93 +411,156 @@ class QtPlotWidget(FigureCanvasQTAgg):
         x_min, x_max, y_min, y_max = self.bounds
         z_min, z_max = y_min, y_max
         
-        # Create 3D grid ONCE (shared by all shapes)
-        print(f"[PLOTTER] Creating {resolution}x{resolution}x{resolution} 3D grid...")
-        x_vals = np.linspace(x_min, x_max, resolution)
-        y_vals = np.linspace(y_min, y_max, resolution)
-        z_vals = np.linspace(z_min, z_max, resolution)
-        X, Y, Z = np.meshgrid(x_vals, y_vals, z_vals, indexing='ij')
-        
+        # 3D grid shared by all shapes, reused across redraws
+        grid, _ = self._get_grid(resolution)
+        visible = [shape for shape in shapes if shape.visible]
         for shape in shapes:
             if not shape.visible:
-                print(f"[PLOTTER] Skipping hidden shape: {shape.name}")
+                log.debug("Skipping hidden shape: %s", shape.name)
+        
+        # Meshes are reused for unchanged shapes, and for transforms seen
+        # recently (e.g. dragging a shape back), up to MESH_CACHE_SIZE entries
+        mesh_cache = self._mesh_cache
+        keys = [(shape._expr, shape.translation, shape.rotation_quat, self.bounds, resolution)
+                for shape in visible]
+        todo = {key: shape for shape, key in zip(visible, keys) if key not in mesh_cache}
+        
+        # Compile up front, on this thread
+        for shape in todo.values():
+            shape.get_function(3)
+        
+        # Shapes are independent: evaluate and mesh them on worker threads
+        # (NumPy and marching cubes release the GIL), then draw on this one
+        if len(todo) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(todo), os.cpu_count() or 1)) as pool:
+                computed = list(pool.map(lambda s: self._evaluate_shape_3d(s, grid, resolution), todo.values()))
+        else:
+            computed = [self._evaluate_shape_3d(s, grid, resolution) for s in todo.values()]
+        computed = dict(zip(todo, computed))
+        
+        meshes = []
+        for key in keys:
+            if key in mesh_cache:
+                mesh = mesh_cache[key]
+                mesh_cache.move_to_end(key)
+            else:
+                mesh = computed[key]
+                if mesh is not None:
+                    mesh_cache[key] = mesh
+            meshes.append(mesh)
+        while len(mesh_cache) > self.MESH_CACHE_SIZE:
+            mesh_cache.popitem(last=False)
+        
+        for shape, mesh in zip(visible, meshes):
+            if mesh is None:
                 continue
             
             try:
-                print(f"[PLOTTER] Plotting 3D {shape.name}: {shape.equation_str}")
-                
-                # Get base equation
-                base_eq = shape.get_transformed_equation()
-                
-                if isinstance(base_eq, Eq):
-                    expr = base_eq.lhs - base_eq.rhs
-                else:
-                    expr = base_eq
-                
-                # Convert to numpy function (3D) - CACHED
-                from sympy.abc import z as z_sym
-                print(f"[PLOTTER] Compiling function...")
-                f = lambdify([x, y, z_sym], expr, modules=['numpy'])
-                
-                # Apply transforms
-                tx, ty, tz = shape.translation
-                X_t = X - tx
-                Y_t = Y - ty
-                Z_t = Z - tz
+                verts, faces = mesh
                 
-                # Evaluate on grid
-                print(f"[PLOTTER] Evaluating function on grid...")
-                values = f(X_t, Y_t, Z_t)
-                
-                # Extract isosurface using marching cubes
-                try:
-                    from skimage import measure
-                    print(f"[PLOTTER] Running marching cubes...")
-                    
-                    verts, faces, _, _ = measure.marching_cubes(
-                        values, 
-                        level=0,
-                        spacing=(
-                            (x_max - x_min) / resolution,
-                            (y_max - y_min) / resolution,
-                            (z_max - z_min) / resolution
-                        ),
-                        allow_degenerate=False
-                    )
-                    
-                    # Offset vertices
-                    verts[:, 0] += x_min
-                    verts[:, 1] += y_min
-                    verts[:, 2] += z_min
-                    
-                    # Plot surface with reduced detail for performance
-                    print(f"[PLOTTER] Rendering surface ({len(verts)} vertices)...")
-                    self.ax.plot_trisurf(
-                        verts[:, 0], verts[:, 1], faces, verts[:, 2],
-                        color=shape.color, 
-                        alpha=0.8,
-                        linewidth=0.2,
-                        antialiased=True,
-                        shade=True
-                    )
-                    
-                    print(f"[PLOTTER] ✓ {shape.name} plotted (3D isosurface)")
-                
-                except ImportError:
-                    print(f"[PLOTTER] ✗ scikit-image not installed - install with: pip install scikit-image")
+                # Plot surface with reduced detail for performance
+                log.debug("Rendering %s surface (%d vertices)", shape.name, len(verts))
+                self.ax.plot_trisurf(
+                    verts[:, 0], verts[:, 1], faces, verts[:, 2],
+                    color=shape.color, 
+                    alpha=0.8,
+                    linewidth=0.2,
+                    antialiased=True,
+                    shade=True
+                )
             
-            except Exception as e:
-                print(f"[PLOTTER] ✗ Error plotting 3D {shape.name}: {e}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                log.exception("Error plotting 3D %s", shape.name)
         
         # Set limits
         self.ax.set_xlim(x_min, x_max)
         self.ax.set_ylim(y_min, y_max)
         self.ax.set_zlim(z_min, z_max)
         
-        self.draw()
-        print(f"[PLOTTER] ✓ All 3D shapes rendered")
+        self.draw_idle()
+        log.debug("All 3D shapes rendered")
+    
+    def _evaluate_shape_3d(self, shape, grid, resolution):
+        """
+        Evaluate a shape on the 3D grid and extract its isosurface
+        
+        Safe to run off the GUI thread: touches no matplotlib state.
+        
+        Returns:
+            (verts, faces) in plot coordinates, or None if the shape failed
+        """
+        x_min, x_max, y_min, y_max = self.bounds
+        z_min, z_max = y_min, y_max
+        X, Y, Z = grid
+        
+        try:
+            log.debug("Evaluating 3D %s: %s", shape.name, shape.equation_str)
+            
+            # Compiled numpy function (3D) - CACHED on the shape
+            f = shape.get_function(3)
+            
+            # Evaluate on grid; out-of-domain points (sqrt, log) just become NaN.
+            # Slabs along the first axis keep each slab's transformed coordinates
+            # and expression temporaries small enough to stay in L2.
+            tx, ty, tz = shape.translation
+            values = np.empty(X.shape, dtype=X.dtype)
+            tile = max(1, self.TILE_BYTES // (X[0].size * X.itemsize))
+            # Translated-slab scratch, reused by every slab of this shape
+            # (per call, since shapes are evaluated concurrently)
+            scratch = np.empty((3, min(tile, X.shape[0])) + X.shape[1:], dtype=X.dtype)
+            # Inverse rotation of a whole slab is one (3, 3) @ (3, N) matmul:
+            # local = R^T (p - t). Skipped for unrotated shapes
+            rotated = None
+            if shape.rotation_quat != (1.0, 0.0, 0.0, 0.0):
+                inv_rot = shape.rotation_matrix.T.astype(X.dtype)
+                rotated = np.empty_like(scratch)
+            with np.errstate(all='ignore'):
+                for k in range(0, X.shape[0], tile):
+                    sl = slice(k, k + tile)
+                    n = len(X[sl])
+                    xt, yt, zt = scratch[:, :n]
+                    np.subtract(X[sl], tx, out=xt)
+                    np.subtract(Y[sl], ty, out=yt)
+                    np.subtract(Z[sl], tz, out=zt)
+                    if rotated is not None:
+                        local = rotated[:, :n]
+                        np.matmul(inv_rot, scratch[:, :n].reshape(3, -1), out=local.reshape(3, -1))
+                        xt, yt, zt = local
+                    values[sl] = f(xt, yt, zt)
+            
+            # Extract isosurface using marching cubes
+            marching_cubes = _get_marching_cubes()
+            if marching_cubes is None:
+                return None
+            
+            spacing = (
+                (x_max - x_min) / resolution,
+                (y_max - y_min) / resolution,
+                (z_max - z_min) / resolution
+            )
+            # Skips the per-triangle degeneracy scan; plot_trisurf copes
+            verts, faces, _, _ = marching_cubes(
+                values, level=0, spacing=spacing, allow_degenerate=True
+            )
+            
+            # Too many faces for plot_trisurf: re-extract on a coarser lattice.
+            # Face count falls with the square of the step.
+            if len(faces) > self.MAX_TRISURF_FACES:
+                step = math.ceil(math.sqrt(len(faces) / self.MAX_TRISURF_FACES))
+                log.debug("Decimating %d faces (step %d)", len(faces), step)
+                verts, faces, _, _ = marching_cubes(
+                    values, level=0, spacing=spacing, step_size=step, allow_degenerate=True
+                )
+            
+            # Offset vertices
+            verts[:, 0] += x_min
+            verts[:, 1] += y_min
+            verts[:, 2] += z_min
+            return verts, faces
+        
+        except Exception:
+            log.exception("Error plotting 3D %s", shape.name)
+        return None
     
     def plot_equation(self, equation, clear=True, resolution=500):
         """
@@ -257,8 +571,8 @@ class QtPlotWidget(FigureCanvasQTAgg):
             clear: Whether to clear previous plots
             resolution: Number of points in each direction
         """
-        print(f"\n[PLOTTER] Single equation plot (legacy mode)")
-        print(f"[PLOTTER] Equation: {equation}")
+        log.debug("Single equation plot (legacy mode): %s", equation)
+        self._forget_background()
         
         if clear:
             self.ax.clear()
@@ -278,49 +592,55 @@ class QtPlotWidget(FigureCanvasQTAgg):
             else:
                 expr = equation
             
-            # Convert to numpy function
-            f = lambdify([x, y], expr, modules=['numpy'])
+            # Compiled function, cached per canonical expression across calls
+            f = compile_expression(expr.doit(), 2)
             
-            # Create grid
-            x_vals = np.linspace(x_min, x_max, resolution)
-            y_vals = np.linspace(y_min, y_max, resolution)
-            X, Y = np.meshgrid(x_vals, y_vals)
+            # Open grid axes: plot_shapes' cached grid in 2D
+            if self.mode == '2d':
+                (X, Y), _ = self._get_grid(resolution)
+            else:
+                X = np.linspace(x_min, x_max, resolution, dtype=np.float32)[np.newaxis, :]
+                Y = np.linspace(y_min, y_max, resolution, dtype=np.float32)[:, np.newaxis]
             
             # Evaluate
-            Z = f(X, Y)
+            with np.errstate(all='ignore'):
+                Z = np.broadcast_to(f(X, Y), (Y.shape[0], X.shape[1]))
+            if not np.isfinite(Z).all():
+                Z = np.ma.masked_invalid(Z)
             
-            # Plot contour
-            self.ax.contour(X, Y, Z, levels=[0], colors='blue', linewidths=2)
+            # Zero level only, extracted by contourpy like plot_shapes
+            lines = contour_generator(X[0], Y[:, 0], Z, name='serial').lines(0.0)
+            self.ax.add_collection(LineCollection(lines, colors='blue', linewidths=2))
             
             # Set limits
             self.ax.set_xlim(x_min, x_max)
             self.ax.set_ylim(y_min, y_max)
             
-            self.draw()
-            print(f"[PLOTTER] ✓ Plot complete")
+            self.draw_idle()
         
         except Exception as e:
-            print(f"[PLOTTER] ✗ ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error plotting %s", equation)
             
             # Show error
             self.ax.text(0, 0, f"Error:\n{str(e)}", 
                         ha='center', va='center',
                         fontsize=10,
                         bbox=dict(boxstyle='round', facecolor='red', alpha=0.7))
-            self.draw()
+            self.draw_idle()
     
     def set_bounds(self, x_min, x_max, y_min, y_max):
         """Update plot bounds"""
         self.bounds = (x_min, x_max, y_min, y_max)
+        self._grid_cache.clear()
+        self._forget_background()
         self.ax.set_xlim(x_min, x_max)
         self.ax.set_ylim(y_min, y_max)
-        self.draw()
+        self.draw_idle()
     
     def clear_plot(self):
         """Clear the plot"""
         self.ax.clear()
+        self._forget_background()
         
         if self.mode == '2d':
             self.ax.set_xlabel('x', fontsize=12)
@@ -341,4 +661,4 @@ class QtPlotWidget(FigureCanvasQTAgg):
             self.ax.set_ylim(y_min, y_max)
             self.ax.set_zlim(y_min, y_max)
         
-        self.draw()
\ No newline at end of file
+        self.draw_idle()
\ No newline at end of file
@@ -6,18 +6,125 @@ FIXED VERSION with quaternion sync and 3D toggle
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QTextEdit, QPushButton, QLabel, QSplitter, QScrollArea,
-    QLineEdit, QCheckBox, QFrame, QMessageBox
+    QLineEdit, QCheckBox, QFrame, QMessageBox, QGridLayout, QApplication
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QIcon, QPainter, QPalette, QPixmap
+from sympy import Expr
 
+import logging
 import sys
 import os
+from functools import lru_cache
+from typing import Dict, List
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from rendering.plotter import QtPlotWidget
 from math_engine.environment import MathEnvironment
-from math_engine.shape import ShapeManager, Shape
+from math_engine.shape import ShapeManager, Shape, canonical_expression, compile_expression
+
+
+log = logging.getLogger(__name__)
+
+# Per-widget stylesheets, shared as constants, for the window's few
+# one-off buttons. A window- or application-wide sheet would route every
+# child widget through QStyleSheetStyle and made adding shapes ~70%
+# slower. Widgets repeated per shape use no stylesheets at all: cached
+# pixmaps, fonts and palettes instead.
+_ADD_BTN_CSS = """
+    QPushButton {
+        background-color: #4CAF50;
+        color: white;
+        padding: 8px;
+        font-size: 12px;
+        border-radius: 4px;
+    }
+"""
+_UPDATE_BTN_CSS = """
+    QPushButton {
+        background-color: #2196F3;
+        color: white;
+        padding: 10px;
+        border-radius: 4px;
+    }
+"""
+_MODE_TOGGLE_BTN_CSS = """
+    QPushButton {
+        background-color: #607D8B;
+        color: white;
+        padding: 5px 10px;
+        border-radius: 4px;
+    }
+"""
+
+
+# ShapeWidget transform fields, one group per row:
+# (heading, Shape attribute, ((label, input attribute), ...), text format, width, unit, slot)
+_TRANSFORM_ROWS = (
+    ("Position:", 'translation',
+     (("X:", 'tx_input'), ("Y:", 'ty_input'), ("Z:", 'tz_input')),
+     "{}", 60, None, 'on_euler_changed'),
+    ("Rotation (Euler):", 'rotation_euler',
+     (("P:", 'pitch_input'), ("R:", 'roll_input'), ("Y:", 'yaw_input')),
+     "{}", 50, "°", 'on_euler_changed'),
+    ("Rotation (Quaternion):", 'rotation_quat',
+     (("w:", 'qw_input'), ("x:", 'qx_input'), ("y:", 'qy_input'), ("z:", 'qz_input')),
+     "{:.4f}", 60, None, 'on_quat_changed'),
+)
+# Label/field column pairs in the widest row
+_TRANSFORM_COLUMNS = max(len(fields) for _, _, fields, *_ in _TRANSFORM_ROWS)
+
+
+@lru_cache(maxsize=None)
+def _font(size: int, bold: bool = True, family: str = "Arial") -> QFont:
+    """Shared QFont, built on first use (after the QApplication exists)"""
+    return QFont(family, size, QFont.Weight.Bold if bold else QFont.Weight.Normal)
+
+
+@lru_cache(maxsize=None)
+def _mono_font() -> QFont:
+    """Default-size monospace font of the equation labels"""
+    font = QFont("monospace")
+    font.setStyleHint(QFont.StyleHint.Monospace)
+    return font
+
+
+@lru_cache(maxsize=None)
+def _equation_palette() -> QPalette:
+    """Application palette with the equation labels' grey text"""
+    palette = QPalette(QApplication.palette())
+    palette.setColor(QPalette.ColorRole.WindowText, QColor("#666"))
+    return palette
+
+
+@lru_cache(maxsize=None)
+def _color_swatch(color: str, w: int = 16, h: int = 12) -> QPixmap:
+    """Shape color swatch with a 1px black border, drawn once per color"""
+    pixmap = QPixmap(w, h)
+    pixmap.fill(QColor(color))
+    painter = QPainter(pixmap)
+    painter.setPen(QColor("black"))
+    painter.drawRect(0, 0, w - 1, h - 1)
+    painter.end()
+    return pixmap
+
+
+@lru_cache(maxsize=None)
+def _delete_icon(size: int = 16) -> QIcon:
+    """Red square with a white cross for the delete buttons, drawn once"""
+    pixmap = QPixmap(size, size)
+    pixmap.fill(QColor("#f44336"))
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    pen = painter.pen()
+    pen.setColor(QColor("white"))
+    pen.setWidthF(2.0)
+    painter.setPen(pen)
+    inset = size // 4
+    painter.drawLine(inset, inset, size - inset, size - inset)
+    painter.drawLine(inset, size - inset, size - inset, inset)
+    painter.end()
+    return QIcon(pixmap)
 
 
 class ShapeWidget(QFrame):
@@ -40,7 +147,7 @@ class ShapeWidget(QFrame):
         # Header
         header = QHBoxLayout()
         self.name_label = QLabel(self.shape.name)
-        self.name_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        self.name_label.setFont(_font(10))
         header.addWidget(self.name_label)
         header.addStretch()
         
@@ -49,99 +156,48 @@ class ShapeWidget(QFrame):
         self.visible_checkbox.stateChanged.connect(self.on_visibility_changed)
         header.addWidget(self.visible_checkbox)
         
-        self.delete_btn = QPushButton("✕")
+        self.delete_btn = QPushButton()
+        self.delete_btn.setIcon(_delete_icon())
+        self.delete_btn.setToolTip("Delete shape")
         self.delete_btn.setMaximumWidth(30)
         self.delete_btn.clicked.connect(lambda: self.on_delete(self.shape))
-        self.delete_btn.setStyleSheet("background-color: #f44336; color: white;")
         header.addWidget(self.delete_btn)
         layout.addLayout(header)
         
         # Equation
         eq_label = QLabel(f"Equation: {self.shape.equation_str}")
         eq_label.setWordWrap(True)
-        eq_label.setStyleSheet("color: #666; font-family: monospace;")
+        eq_label.setFont(_mono_font())
+        eq_label.setPalette(_equation_palette())
         layout.addWidget(eq_label)
         
-        # Translation
-        trans_layout = QHBoxLayout()
-        trans_layout.addWidget(QLabel("Position:"))
-        trans_layout.addWidget(QLabel("X:"))
-        self.tx_input = QLineEdit(str(self.shape.translation[0]))
-        self.tx_input.setMaximumWidth(60)
-        self.tx_input.textChanged.connect(self.on_euler_changed)
-        trans_layout.addWidget(self.tx_input)
-        trans_layout.addWidget(QLabel("Y:"))
-        self.ty_input = QLineEdit(str(self.shape.translation[1]))
-        self.ty_input.setMaximumWidth(60)
-        self.ty_input.textChanged.connect(self.on_euler_changed)
-        trans_layout.addWidget(self.ty_input)
-        trans_layout.addWidget(QLabel("Z:"))
-        self.tz_input = QLineEdit(str(self.shape.translation[2]))
-        self.tz_input.setMaximumWidth(60)
-        self.tz_input.textChanged.connect(self.on_euler_changed)
-        trans_layout.addWidget(self.tz_input)
-        trans_layout.addStretch()
-        layout.addLayout(trans_layout)
-        
-        # Euler angles
-        euler_label = QLabel("Rotation (Euler):")
-        euler_label.setFont(QFont("Arial", 9, QFont.Weight.Bold))
-        layout.addWidget(euler_label)
-        
-        euler_layout = QHBoxLayout()
-        euler_layout.addWidget(QLabel("P:"))
-        self.pitch_input = QLineEdit(str(self.shape.rotation_euler[0]))
-        self.pitch_input.setMaximumWidth(50)
-        self.pitch_input.textChanged.connect(self.on_euler_changed)
-        euler_layout.addWidget(self.pitch_input)
-        euler_layout.addWidget(QLabel("R:"))
-        self.roll_input = QLineEdit(str(self.shape.rotation_euler[1]))
-        self.roll_input.setMaximumWidth(50)
-        self.roll_input.textChanged.connect(self.on_euler_changed)
-        euler_layout.addWidget(self.roll_input)
-        euler_layout.addWidget(QLabel("Y:"))
-        self.yaw_input = QLineEdit(str(self.shape.rotation_euler[2]))
-        self.yaw_input.setMaximumWidth(50)
-        self.yaw_input.textChanged.connect(self.on_euler_changed)
-        euler_layout.addWidget(self.yaw_input)
-        euler_layout.addWidget(QLabel("°"))
-        euler_layout.addStretch()
-        layout.addLayout(euler_layout)
-        
-        # Quaternion
-        quat_label = QLabel("Rotation (Quaternion):")
-        quat_label.setFont(QFont("Arial", 9, QFont.Weight.Bold))
-        layout.addWidget(quat_label)
-        
-        quat_layout = QHBoxLayout()
-        quat_layout.addWidget(QLabel("w:"))
-        self.qw_input = QLineEdit(f"{self.shape.rotation_quat[0]:.4f}")
-        self.qw_input.setMaximumWidth(60)
-        self.qw_input.textChanged.connect(self.on_quat_changed)
-        quat_layout.addWidget(self.qw_input)
-        quat_layout.addWidget(QLabel("x:"))
-        self.qx_input = QLineEdit(f"{self.shape.rotation_quat[1]:.4f}")
-        self.qx_input.setMaximumWidth(60)
-        self.qx_input.textChanged.connect(self.on_quat_changed)
-        quat_layout.addWidget(self.qx_input)
-        quat_layout.addWidget(QLabel("y:"))
-        self.qy_input = QLineEdit(f"{self.shape.rotation_quat[2]:.4f}")
-        self.qy_input.setMaximumWidth(60)
-        self.qy_input.textChanged.connect(self.on_quat_changed)
-        quat_layout.addWidget(self.qy_input)
-        quat_layout.addWidget(QLabel("z:"))
-        self.qz_input = QLineEdit(f"{self.shape.rotation_quat[3]:.4f}")
-        self.qz_input.setMaximumWidth(60)
-        self.qz_input.textChanged.connect(self.on_quat_changed)
-        quat_layout.addWidget(self.qz_input)
-        quat_layout.addStretch()
-        layout.addLayout(quat_layout)
+        # Transform fields apply when an edit is committed (Enter or focus
+        # out), not per keystroke, so half-typed numbers never replot.
+        # All of them share one grid: a heading row, then a row of fields
+        grid = QGridLayout()
+        for row, (heading, attr, fields, fmt, width, unit, slot) in enumerate(_TRANSFORM_ROWS):
+            heading_label = QLabel(heading)
+            heading_label.setFont(_font(9))
+            grid.addWidget(heading_label, 2 * row, 0, 1, -1)
+            values = getattr(self.shape, attr)
+            for col, (label, name) in enumerate(fields):
+                field = QLineEdit(fmt.format(values[col]))
+                field.setMaximumWidth(width)
+                field.editingFinished.connect(getattr(self, slot))
+                setattr(self, name, field)
+                grid.addWidget(QLabel(label), 2 * row + 1, 2 * col)
+                grid.addWidget(field, 2 * row + 1, 2 * col + 1)
+            if unit:
+                grid.addWidget(QLabel(unit), 2 * row + 1, 2 * len(fields))
+        # Keep the fields packed to the left, like the stretch of a box layout
+        grid.setColumnStretch(2 * _TRANSFORM_COLUMNS, 1)
+        layout.addLayout(grid)
         
         # Color
         color_layout = QHBoxLayout()
         color_layout.addWidget(QLabel("Color:"))
-        color_box = QLabel("  ")
-        color_box.setStyleSheet(f"background-color: {self.shape.color}; border: 1px solid black;")
+        color_box = QLabel()
+        color_box.setPixmap(_color_swatch(self.shape.color))
         color_layout.addWidget(color_box)
         color_layout.addStretch()
         layout.addLayout(color_layout)
@@ -162,19 +218,13 @@ class ShapeWidget(QFrame):
             yaw = float(self.yaw_input.text() or 0)
             self.shape.set_rotation_euler(pitch, roll, yaw)
             
-            # Sync quaternion
-            self.qw_input.blockSignals(True)
-            self.qx_input.blockSignals(True)
-            self.qy_input.blockSignals(True)
-            self.qz_input.blockSignals(True)
-            self.qw_input.setText(f"{self.shape.rotation_quat[0]:.4f}")
-            self.qx_input.setText(f"{self.shape.rotation_quat[1]:.4f}")
-            self.qy_input.setText(f"{self.shape.rotation_quat[2]:.4f}")
-            self.qz_input.setText(f"{self.shape.rotation_quat[3]:.4f}")
-            self.qw_input.blockSignals(False)
-            self.qx_input.blockSignals(False)
-            self.qy_input.blockSignals(False)
-            self.qz_input.blockSignals(False)
+            # Sync quaternion. No signal blocking needed: the fields' slots are
+            # on editingFinished, which setText never emits
+            qw, qx, qy, qz = self.shape.rotation_quat
+            self.qw_input.setText(f"{qw:.4f}")
+            self.qx_input.setText(f"{qx:.4f}")
+            self.qy_input.setText(f"{qy:.4f}")
+            self.qz_input.setText(f"{qz:.4f}")
             
             self.on_update()
         except ValueError:
@@ -195,28 +245,72 @@ class ShapeWidget(QFrame):
             euler = self.shape.quat_to_euler()
             self.shape.rotation_euler = euler
             
-            # Sync euler
-            self.pitch_input.blockSignals(True)
-            self.roll_input.blockSignals(True)
-            self.yaw_input.blockSignals(True)
+            # Sync euler (setText doesn't emit editingFinished)
             self.pitch_input.setText(f"{euler[0]:.2f}")
             self.roll_input.setText(f"{euler[1]:.2f}")
             self.yaw_input.setText(f"{euler[2]:.2f}")
-            self.pitch_input.blockSignals(False)
-            self.roll_input.blockSignals(False)
-            self.yaw_input.blockSignals(False)
             
             self.on_update()
         except ValueError:
             pass
 
 
+class _ParseSignals(QObject):
+    finished = pyqtSignal(object)  # [(equation_str, equation), ...]
+    failed = pyqtSignal(str)  # error message
+
+
+class ParseTask(QRunnable):
+    """
+    Parse equation strings with a MathEnvironment on a QThreadPool thread
+    
+    Each equation is also compiled for the given plot dimension, which is
+    the slow part (numba takes 0.3-1.2 s). compile_expression is cached, so
+    the shape made from it on the GUI thread gets the finished kernel.
+    The result arrives through signals, which Qt delivers on the thread
+    that created the task (the GUI thread).
+    """
+    
+    def __init__(self, env: MathEnvironment, equations: List[str], dimension: int = 2):
+        super().__init__()
+        self.env = env
+        self.equations = equations
+        self.dimension = dimension
+        self.signals = _ParseSignals()
+    
+    def run(self):
+        try:
+            parsed = [(equation_str, self.env.parse(equation_str)) for equation_str in self.equations]
+            for _, equation in parsed:
+                expr = canonical_expression(equation)
+                # True/False equations are rejected by add_shape
+                if isinstance(expr, Expr):
+                    compile_expression(expr, self.dimension)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(parsed)
+
+
 class MainWindow(QMainWindow):
+    # Quiet time before a requested replot runs; edits inside it share one replot
+    REPLOT_DELAY_MS = 30
+    
     def __init__(self):
         super().__init__()
         self.env = MathEnvironment()
         self.shape_manager = ShapeManager()
-        self.shape_widgets = []
+        self.shape_widgets: Dict[int, ShapeWidget] = {}  # id(shape) -> its widget, in panel order
+        
+        # update_plot only (re)starts this timer, so a burst of edits
+        # (tabbing through fields, several shapes changed) replots once
+        self._replot_timer = QTimer(self)
+        self._replot_timer.setSingleShot(True)
+        self._replot_timer.setInterval(self.REPLOT_DELAY_MS)
+        self._replot_timer.timeout.connect(self._do_update_plot)
+        # State the plot was last drawn for; a replot of the same state is skipped
+        self._last_plot_fp = None
+        self._parse_task = None  # in-flight ParseTask of on_add_shape
         self.init_ui()
         self.statusBar().showMessage("Ready")
     
@@ -239,7 +333,7 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(panel)
         
         title = QLabel("Shapes")
-        title.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+        title.setFont(_font(14))
         layout.addWidget(title)
         
         # Add shape section
@@ -248,31 +342,23 @@ class MainWindow(QMainWindow):
         add_layout = QVBoxLayout(add_section)
         
         add_label = QLabel("Add New Shape:")
-        add_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        add_label.setFont(_font(10))
         add_layout.addWidget(add_label)
         
         self.equation_input = QLineEdit()
         self.equation_input.setPlaceholderText("Enter equation (e.g., x^2 + y^2 = 25)")
-        self.equation_input.setFont(QFont("Courier", 10))
+        self.equation_input.setFont(_font(10, bold=False, family="Courier"))
         add_layout.addWidget(self.equation_input)
         
-        add_btn = QPushButton("➕ Add Shape")
-        add_btn.clicked.connect(self.on_add_shape)
-        add_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px;
-                font-size: 12px;
-                border-radius: 4px;
-            }
-        """)
-        add_layout.addWidget(add_btn)
+        self.add_btn = QPushButton("➕ Add Shape")
+        self.add_btn.clicked.connect(self.on_add_shape)
+        self.add_btn.setStyleSheet(_ADD_BTN_CSS)
+        add_layout.addWidget(self.add_btn)
         layout.addWidget(add_section)
         
         # Shape list
         list_label = QLabel("Current Shapes:")
-        list_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        list_label.setFont(_font(10))
         layout.addWidget(list_label)
         
         scroll = QScrollArea()
@@ -287,15 +373,8 @@ class MainWindow(QMainWindow):
         
         # Update button
         update_btn = QPushButton("🔄 Update Plot")
-        update_btn.clicked.connect(self.update_plot)
-        update_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                padding: 10px;
-                border-radius: 4px;
-            }
-        """)
+        update_btn.clicked.connect(self.force_update_plot)
+        update_btn.setStyleSheet(_UPDATE_BTN_CSS)
         layout.addWidget(update_btn)
         
         return panel
@@ -307,20 +386,13 @@ class MainWindow(QMainWindow):
         # Header with 2D/3D toggle
         header_layout = QHBoxLayout()
         title = QLabel("Plot Viewport")
-        title.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+        title.setFont(_font(14))
         header_layout.addWidget(title)
         header_layout.addStretch()
         
         self.mode_toggle_btn = QPushButton("Switch to 3D")
         self.mode_toggle_btn.clicked.connect(self.toggle_plot_mode)
-        self.mode_toggle_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #607D8B;
-                color: white;
-                padding: 5px 10px;
-                border-radius: 4px;
-            }
-        """)
+        self.mode_toggle_btn.setStyleSheet(_MODE_TOGGLE_BTN_CSS)
         header_layout.addWidget(self.mode_toggle_btn)
         layout.addLayout(header_layout)
         
@@ -340,13 +412,19 @@ class MainWindow(QMainWindow):
         self.current_mode = '3d' if self.current_mode == '2d' else '2d'
         self.mode_toggle_btn.setText(f"Switch to {'2D' if self.current_mode == '3d' else '3D'}")
         
-        self.plot_container_layout.removeWidget(self.plot_widget)
-        self.plot_widget.deleteLater()
-        
-        self.plot_widget = QtPlotWidget(bounds=(-10, 10, -10, 10), mode=self.current_mode)
-        self.plot_container_layout.addWidget(self.plot_widget)
+        try:
+            # Swaps the axes on the existing canvas instead of rebuilding the widget
+            self.plot_widget.set_mode(self.current_mode)
+        except Exception:
+            log.exception("Switching plot mode in place failed, recreating the plot widget")
+            self.plot_container_layout.removeWidget(self.plot_widget)
+            self.plot_widget.deleteLater()
+            
+            self.plot_widget = QtPlotWidget(bounds=(-10, 10, -10, 10), mode=self.current_mode)
+            self.plot_container_layout.addWidget(self.plot_widget)
         
-        self.update_plot()
+        # The new axes are empty whatever the shapes look like
+        self.force_update_plot()
         self.statusBar().showMessage(f"Switched to {self.current_mode.upper()}")
     
     def on_add_shape(self):
@@ -355,31 +433,96 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Please enter an equation")
             return
         
+        # Parse and compile on a pool thread; the shape and its widget are
+        # made back on this one when the task reports in
+        self.add_btn.setEnabled(False)
+        self.statusBar().showMessage(f"Parsing: {equation_str}")
+        task = ParseTask(self.env, [equation_str], 3 if self.current_mode == '3d' else 2)
+        task.signals.finished.connect(self._on_add_parsed)
+        task.signals.failed.connect(self._on_add_failed)
+        self._parse_task = task  # keeps its signals alive until they are delivered
+        QThreadPool.globalInstance().start(task)
+    
+    def _on_add_parsed(self, parsed):
+        self._parse_task = None
+        self.add_btn.setEnabled(True)
         try:
-            equation = self.env.parse(equation_str)
-            shape = self.shape_manager.add_shape(equation_str, equation)
-            widget = ShapeWidget(shape, on_update=self.update_plot, on_delete=self.on_delete_shape)
-            
-            self.shapes_layout.insertWidget(len(self.shape_widgets), widget)
-            self.shape_widgets.append(widget)
-            self.equation_input.clear()
-            self.update_plot()
+            shape, = self._insert_shapes(parsed)
+            # Keep anything typed while the task ran
+            if self.equation_input.text().strip() == parsed[0][0]:
+                self.equation_input.clear()
             self.statusBar().showMessage(f"Added: {shape.name}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to parse:\n{str(e)}")
     
+    def _on_add_failed(self, message):
+        self._parse_task = None
+        self.add_btn.setEnabled(True)
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Error", f"Failed to parse:\n{message}")
+    
+    def add_shapes_bulk(self, equations: List[str]) -> List[Shape]:
+        """
+        Add a shape (and its ShapeWidget) per equation string, with one replot
+        
+        Every equation is parsed before anything is added, so a parse error
+        leaves the scene unchanged.
+        """
+        return self._insert_shapes([(equation_str, self.env.parse(equation_str)) for equation_str in equations])
+    
+    def _insert_shapes(self, parsed) -> List[Shape]:
+        """
+        Add shapes for (equation_str, equation) pairs. The widgets are inserted
+        with updates disabled on the shapes panel, so it is laid out and
+        painted once.
+        """
+        shapes = []
+        self.shapes_container.setUpdatesEnabled(False)
+        try:
+            for equation_str, equation in parsed:
+                shape = self.shape_manager.add_shape(equation_str, equation)
+                widget = ShapeWidget(shape, on_update=self.update_plot, on_delete=self.on_delete_shape)
+                # Before the trailing stretch
+                self.shapes_layout.insertWidget(len(self.shape_widgets), widget)
+                self.shape_widgets[id(shape)] = widget
+                shapes.append(shape)
+        finally:
+            self.shapes_container.setUpdatesEnabled(True)
+        
+        self.update_plot()
+        return shapes
+    
     def on_delete_shape(self, shape: Shape):
         self.shape_manager.remove_shape(shape)
-        for i, widget in enumerate(self.shape_widgets):
-            if widget.shape == shape:
-                self.shapes_layout.removeWidget(widget)
-                widget.deleteLater()
-                self.shape_widgets.pop(i)
-                break
+        widget = self.shape_widgets.pop(id(shape), None)
+        if widget is not None:
+            self.shapes_layout.removeWidget(widget)
+            widget.deleteLater()
         self.update_plot()
         self.statusBar().showMessage(f"Deleted: {shape.name}")
     
     def update_plot(self):
+        """Request a replot; it runs once the edits stop for REPLOT_DELAY_MS"""
+        self._replot_timer.start()
+    
+    def force_update_plot(self):
+        """Request a replot even if nothing changed since the last one"""
+        self._last_plot_fp = None
+        self.update_plot()
+    
+    def _plot_fingerprint(self):
+        """Everything the plot depends on; equal fingerprints draw the same plot"""
+        return (self.current_mode, self.plot_widget.bounds, tuple(
+            (id(s), s.equation, s.translation, s.rotation_euler, s.rotation_quat, s.visible, s.color)
+            for s in self.shape_manager.shapes
+        ))
+    
+    def _do_update_plot(self):
+        # Edits that were reverted before the replot (or changed nothing) are free
+        fp = self._plot_fingerprint()
+        if fp == self._last_plot_fp:
+            return
+        
         visible_shapes = self.shape_manager.get_visible_shapes()
         if len(visible_shapes) == 0:
             self.plot_widget.clear_plot()
@@ -387,10 +530,11 @@ class MainWindow(QMainWindow):
         else:
             self.plot_widget.plot_shapes(visible_shapes)
             self.statusBar().showMessage(f"Plotted {len(visible_shapes)} shape(s)")
+        # Only once the plot is drawn: a plot that raised is retried next time
+        self._last_plot_fp = fp
 
 
 def main():
-    from PyQt6.QtWidgets import QApplication
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     window = MainWindow()
@@ -3,160 +3,216 @@ Test the Math Engine
 Run this to verify the math engine works before launching the full UI
 """
 
+import logging
+import math
 import sys
 sys.path.insert(0, 'src')
 
-from math_engine.environment import MathEnvironment
+import numpy as np
+import pytest
+from sympy import Abs, Equality, Rational, sqrt, srepr, symbols
+from sympy.parsing.sympy_parser import parse_expr
 
+from math_engine.environment import MathEnvironment, _fast_parse
+from math_engine.shape import ShapeManager
+
+
+# Test narration; formatted only when DEBUG is enabled (python test_engine.py)
+log = logging.getLogger("mathtool.tests")  # fixed name: the same logger when run as __main__
+
+x, y, r, s = symbols("x y r s")
 
-def test_basic_parsing():
-    """Test basic equation parsing"""
-    print("=" * 50)
-    print("TEST 1: Basic Parsing")
-    print("=" * 50)
-    
-    env = MathEnvironment(dimension=2)
-    
-    # Test 1: Simple circle
-    print("\n1. Circle: x^2 + y^2 = 25")
-    eq = env.parse("x^2 + y^2 = 25")
-    print(f"   Parsed: {eq}")
-    print(f"   Type: {type(eq)}")
-    
-    # Test 2: Diamond/Square
-    print("\n2. Diamond: abs(x) + abs(y) = 1")
-    eq = env.parse("abs(x) + abs(y) = 1")
-    print(f"   Parsed: {eq}")
-    
-    # Test 3: Complex equation
-    print("\n3. Complex: x^2 - y^2 = 1")
-    eq = env.parse("x^2 - y^2 = 1")
-    print(f"   Parsed: {eq}")
 
+@pytest.fixture(scope="module")
+def env2d():
+    """One 2D engine for the module, so repeated equations hit its parse cache"""
+    return MathEnvironment(dimension=2)
 
-def test_dimension_agnostic():
+
+@pytest.fixture(scope="module")
+def env3d():
+    return MathEnvironment(dimension=3)
+
+
+@pytest.mark.parametrize("eq_str,expected_type", [
+    ("x^2 + y^2 = 25", Equality),       # Simple circle
+    ("abs(x) + abs(y) = 1", Equality),  # Diamond/Square
+    ("x^2 - y^2 = 1", Equality),        # Complex equation
+])
+def test_basic_parsing(env2d, eq_str, expected_type):
+    """Test basic equation parsing"""
+    log.debug("Parse: %s", eq_str)
+    eq = env2d.parse(eq_str)
+    log.debug("   Parsed: %s", eq)
+    log.debug("   Type: %s", type(eq))
+    assert isinstance(eq, expected_type)
+
+
+@pytest.mark.parametrize("env_name,eq_str", [
+    ("env2d", "sum(abs(n)) = 1"),
+    ("env2d", "sum(n^2) = 25"),
+    ("env3d", "sum(abs(n)) = 1"),
+    ("env3d", "sum(n^2) = 25"),
+    ("env2d", "product(n) = 10"),
+])
+def test_dimension_agnostic(request, env_name, eq_str):
     """Test dimension-agnostic notation"""
-    print("\n" + "=" * 50)
-    print("TEST 2: Dimension-Agnostic Notation")
-    print("=" * 50)
-    
-    # Test in 2D
-    env = MathEnvironment(dimension=2)
-    
-    print("\n1. In 2D: sum(abs(n)) = 1")
-    eq = env.parse("sum(abs(n)) = 1")
-    print(f"   Expands to: {eq}")
-    
-    print("\n2. In 2D: sum(n^2) = 25")
-    eq = env.parse("sum(n^2) = 25")
-    print(f"   Expands to: {eq}")
-    
-    # Test in 3D
-    env.set_dimension(3)
-    
-    print("\n3. In 3D: sum(abs(n)) = 1")
-    eq = env.parse("sum(abs(n)) = 1")
-    print(f"   Expands to: {eq}")
-    
-    print("\n4. In 3D: sum(n^2) = 25")
-    eq = env.parse("sum(n^2) = 25")
-    print(f"   Expands to: {eq}")
-    
-    # Test product
-    env.set_dimension(2)
-    print("\n5. In 2D: product(n) = 10")
-    eq = env.parse("product(n) = 10")
-    print(f"   Expands to: {eq}")
+    env = request.getfixturevalue(env_name)
+    log.debug("In %dD: %s", env.dimension, eq_str)
+    eq = env.parse(eq_str)
+    log.debug("   Expands to: %s", eq)
+    # n expands to every coordinate of the environment's dimension
+    assert eq.free_symbols == set(env.coord_symbols)
+
+
+@pytest.mark.parametrize("text", [
+    "-x", "--x", "-x**2", "-2", "x - y", "x - y - 2", "x / y", "x / y / 2",
+    "2**-1", "x**y**2", "(x + y)*(x - y)", "x*y*2", "+x - -y",
+    "1.5", "2.5e3", "1e-3", ".5", "00", "007.5", "3*x**2 - 2/x + 1",
+])
+def test_fast_parse_matches_parse_expr(text):
+    """The fast parser builds the same tree as parse_expr(evaluate=False)"""
+    names = {"x": x, "y": y}
+    expected = parse_expr(text, evaluate=False, local_dict=names)
+    assert srepr(_fast_parse(text, names)) == srepr(expected)
+
+
+@pytest.mark.parametrize("text", [
+    "007", "3x", "1.2.3", "1e", "x // y", "sin(x)", "z + 1", "x +", "(x", "x ^ 2", "",
+])
+def test_fast_parse_falls_back(text):
+    """Anything outside the fast grammar is left to parse_expr"""
+    assert _fast_parse(text, {"x": x, "y": y}) is None
 
 
 def test_function_definitions():
     """Test user-defined functions"""
-    print("\n" + "=" * 50)
-    print("TEST 3: Function Definitions")
-    print("=" * 50)
-    
+    # A fresh engine: definitions would otherwise leak into the shared env2d
     env = MathEnvironment(dimension=2)
     
     # Define a function
-    print("\n1. Define: Circle(r) = sum(n^2) - r^2")
-    env.define_function("Circle(r) = sum(n^2) - r^2")
+    log.debug("1. Define: Circle(r) = sum(n^2) - r^2")
+    assert env.define_function("Circle(r) = sum(n^2) - r^2") == "Circle"
     func = env.get_function("Circle")
-    print(f"   Stored: {func}")
-    
+    log.debug("   Stored: %s", func)
+    assert func["params"] == ["r"]
+    assert func["expr"] == x**2 + y**2 - r**2
+
     # Define another
-    print("\n2. Define: Square(s) = sum(abs(n)) - s")
-    env.define_function("Square(s) = sum(abs(n)) - s")
+    log.debug("2. Define: Square(s) = sum(abs(n)) - s")
+    assert env.define_function("Square(s) = sum(abs(n)) - s") == "Square"
     func = env.get_function("Square")
-    print(f"   Stored: {func}")
-    
+    log.debug("   Stored: %s", func)
+    assert func["params"] == ["s"]
+    assert func["expr"] == Abs(x) + Abs(y) - s
+
     # List all functions
-    print(f"\n3. All defined functions: {env.list_functions()}")
+    log.debug("3. All defined functions: %s", env.list_functions())
+    assert env.list_functions() == ["Circle", "Square"]
 
 
-def test_solving():
+@pytest.mark.parametrize("eq_str,solve_for,expected", [
+    ("x^2 + y^2 = 25", "y", {-sqrt(25 - x**2), sqrt(25 - x**2)}),  # Circle
+    ("2*x + 3*y = 6", "y", {2 - Rational(2, 3)*x}),                 # Line
+])
+def test_solving(env2d, eq_str, solve_for, expected):
     """Test equation solving"""
-    print("\n" + "=" * 50)
-    print("TEST 4: Equation Solving")
-    print("=" * 50)
-    
-    env = MathEnvironment(dimension=2)
-    
-    # Solve circle for y
-    print("\n1. Solve: x^2 + y^2 = 25 for y")
-    solutions = env.solve_equation("x^2 + y^2 = 25", "y")
-    print(f"   Solutions: {solutions}")
-    
-    # Solve line for y
-    print("\n2. Solve: 2*x + 3*y = 6 for y")
-    solutions = env.solve_equation("2*x + 3*y = 6", "y")
-    print(f"   Solutions: {solutions}")
+    log.debug("Solve: %s for %s", eq_str, solve_for)
+    solutions = env2d.solve_equation(eq_str, solve_for)
+    log.debug("   Solutions: %s", solutions)
+    assert set(solutions) == expected
 
 
-def test_evaluation():
+@pytest.mark.parametrize("expr_str,values,expected", [
+    ("x^2 + y^2", dict(x=3, y=4), 25),
+    ("abs(x) + abs(y)", dict(x=-2, y=3), 5),
+])
+def test_evaluation(env2d, expr_str, values, expected):
     """Test expression evaluation"""
-    print("\n" + "=" * 50)
-    print("TEST 5: Expression Evaluation")
-    print("=" * 50)
-    
-    env = MathEnvironment(dimension=2)
-    
-    # Evaluate at specific point
-    print("\n1. Evaluate: x^2 + y^2 at (3, 4)")
-    result = env.evaluate("x^2 + y^2", x=3, y=4)
-    print(f"   Result: {result}")
-    print(f"   Expected: 25")
-    
-    print("\n2. Evaluate: abs(x) + abs(y) at (-2, 3)")
-    result = env.evaluate("abs(x) + abs(y)", x=-2, y=3)
-    print(f"   Result: {result}")
-    print(f"   Expected: 5")
+    log.debug("Evaluate: %s at %s", expr_str, values)
+    result = env2d.evaluate(expr_str, **values)
+    log.debug("   Result: %s", result)
+    log.debug("   Expected: %s", expected)
+    assert result == pytest.approx(expected)
+
+
+def test_evaluate_array(env2d):
+    """Test evaluation on a grid"""
+    log.debug("Evaluate on a grid: x^2 + y^2 at x=[0, 1, 2], y=1")
+    result = env2d.evaluate_array("x^2 + y^2", x=np.array([0.0, 1.0, 2.0]), y=1.0)
+    log.debug("   Result: %s", result)
+    log.debug("   Expected: [1. 2. 5.]")
+    assert np.allclose(result, [1.0, 2.0, 5.0])
+
+
+@pytest.mark.parametrize("eq_str", ["x = x", "1 = 2"])
+def test_add_shape_rejects_non_curves(eq_str):
+    """Equations that reduce to True/False never reach the manager"""
+    manager = ShapeManager()
+    equation = MathEnvironment(dimension=2).parse(eq_str)
+    with pytest.raises(ValueError):
+        manager.add_shape(eq_str, equation)
+    assert len(manager.shapes) == 0
+
+
+def _zero_crossing_cells(shape, X, Y):
+    """(x0, x1, y0, y1) of every grid cell edge where the sampled field changes sign"""
+    field = shape.sample(X, Y, shape.get_function(2))
+    sign = np.sign(field)
+    cells = []
+    rows, cols = np.nonzero(sign[:, :-1] * sign[:, 1:] <= 0)
+    cells += [(X[0, c], X[0, c + 1], Y[r, 0], Y[r, 0]) for r, c in zip(rows, cols)]
+    rows, cols = np.nonzero(sign[:-1, :] * sign[1:, :] <= 0)
+    cells += [(X[0, c], X[0, c], Y[r, 0], Y[r + 1, 0]) for r, c in zip(rows, cols)]
+    return cells
+
+
+@pytest.mark.parametrize("eq_str,translation,yaw", [
+    ("x^2 + y^2 = 25", (0, 0, 0), 0),             # Circle
+    ("x^2/16 + y^2/4 = 1", (0, 0, 0), 0),         # Ellipse
+    ("(x - 3)^2 + (y + 2)^2 = 4", (0, 0, 0), 0),  # Offset circle
+    ("exp(x) + y^2 = 5", (0, 0, 0), 0),
+    ("1/(x^2 + 1) = y", (0, 0, 0), 0),
+    ("x^2/16 + y^2/4 = 1", (0, 0, 0), 30),        # Rotated
+    ("x^2/16 + y^2/4 = 1", (5, -3, 0), 0),        # Translated
+    ("(x - 3)^2 + (y + 2)^2 = 4", (-4, 6, 0), 135),
+])
+def test_bbox_2d_contains_curve(env2d, eq_str, translation, yaw):
+    """Every sampled zero crossing of the transformed curve lies inside its box"""
+    shape = ShapeManager().add_shape(eq_str, env2d.parse(eq_str))
+    shape.translation = translation
+    shape.rotation_euler = (0.0, 0.0, float(yaw))
+    xmin, xmax, ymin, ymax = shape.get_bbox_2d()
+    log.debug("%s at %s, %s deg: box %s", eq_str, translation, yaw, (xmin, xmax, ymin, ymax))
+    
+    X, Y = np.meshgrid(np.linspace(-20, 20, 801), np.linspace(-20, 20, 801))
+    cells = _zero_crossing_cells(shape, X, Y)
+    assert cells
+    for x0, x1, y0, y1 in cells:
+        assert x1 >= xmin and x0 <= xmax and y1 >= ymin and y0 <= ymax
+
+
+@pytest.mark.parametrize("eq_str,expected", [
+    ("x + y = 1", (-math.inf, math.inf, -math.inf, math.inf)),       # Unbounded line
+    ("sin(x) + y^2 = 1", (-math.inf, math.inf, -2.0, 2.0)),         # Periodic in x
+    ("x^2 + y^2 + z^2 = 1", (-math.inf, math.inf, -math.inf, math.inf)),  # Not a 2D curve
+    ("gamma(x) + y^2 = 3", (-math.inf, math.inf, -math.inf, math.inf)),   # No interval rules
+])
+def test_bbox_2d_unbounded(env2d, eq_str, expected):
+    """Sides that can't be bounded are +-inf, and stay so under rotation"""
+    shape = ShapeManager().add_shape(eq_str, env2d.parse(eq_str))
+    assert shape.get_bbox_2d() == expected
+    shape.rotation_euler = (0.0, 0.0, 30.0)
+    assert shape.get_bbox_2d() == (-math.inf, math.inf, -math.inf, math.inf)
 
 
 def run_all_tests():
-    """Run all tests"""
-    print("\n" + "#" * 50)
-    print("# MATH ENGINE TEST SUITE")
-    print("#" * 50)
-    
-    try:
-        test_basic_parsing()
-        test_dimension_agnostic()
-        test_function_definitions()
-        test_solving()
-        test_evaluation()
-        
-        print("\n" + "=" * 50)
-        print("✓ ALL TESTS PASSED")
-        print("=" * 50)
-        
-    except Exception as e:
-        print("\n" + "=" * 50)
-        print("✗ TEST FAILED")
-        print("=" * 50)
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+    """Run all tests, with their output shown"""
+    # pytest's log capture is off, so the narration goes to this handler
+    return pytest.main([__file__, "-v", "-s", "-p", "no:logging"])
 
 
 if __name__ == "__main__":
-    run_all_tests()
+    logging.basicConfig(format="%(message)s")
+    log.setLevel(logging.DEBUG)
+    sys.exit(run_all_tests())